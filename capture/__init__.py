@@ -1,5 +1,5 @@
 """Capture module."""
 
-from capture.playwright_capture import PlaywrightCapture
+from capture.playwright_capture import BrowserPool, PlaywrightCapture
 
-__all__ = ["PlaywrightCapture"]
+__all__ = ["BrowserPool", "PlaywrightCapture"]
@@ -10,29 +10,539 @@ Playwright-based workflow capture - UPDATED WITH ALL FIXES
 
 from __future__ import annotations
 
+import atexit
 import base64
+import binascii
+import functools
+import hashlib
+import io
 import json
+import threading
 import time
 import re
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from itertools import islice
 from pathlib import Path
 from typing import Any, Dict, List
 
+try:
+    # Recent anthropic SDKs are built against httpx 2.x, published as httpx2;
+    # the pool we hand them must come from the same generation.
+    import httpx2 as httpx
+except ImportError:  # pragma: no cover - older SDKs use httpx 1.x
+    import httpx
+
 from playwright.sync_api import sync_playwright, Page
-from anthropic import Anthropic
+from anthropic import Anthropic, DefaultHttpxClient
 
 from core.config import Config
 from utils.helpers import slugify
 
+try:
+    import pybase64
+except ImportError:  # pragma: no cover - optional speedup
+    pybase64 = None
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional speedup
+    Image = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 
 logger = logging.getLogger(__name__)
 
+# One keep-alive pool for every Claude call so steps after the first skip the
+# TCP + TLS handshake to api.anthropic.com.
+_HTTP_CLIENT = DefaultHttpxClient(
+    limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+    timeout=httpx.Timeout(60.0, connect=5.0),
+)
+atexit.register(_HTTP_CLIENT.close)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_anthropic_client() -> Anthropic:
+    """Builds the Anthropic client once per process; every capture instance shares it."""
+    return Anthropic(api_key=Config.ANTHROPIC_API_KEY, http_client=_HTTP_CLIENT, max_retries=2)
+
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+# Last-resort classification of an unparseable response: one pass over the
+# raw text instead of a .lower() copy plus half a dozen substring scans.
+# The earliest phrase in the text wins.
+_FALLBACK_RE = re.compile(
+    r"(?P<complete>\b(?:done|complete|success)\b)"
+    r"|(?P<auth>\b(?:login|sign in|authenticate)\b)"
+    r"|(?P<click_next>\bclick\b.*?\bnext\b)"
+    r"|(?P<click_submit>\bclick\b.*?\bsubmit\b)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+_FALLBACK_DECISIONS: Dict[str, Dict[str, str]] = {
+    "auth": {"action": "done", "description": "Login required - stopping"},
+    "complete": {"action": "done", "description": "Inferred completion from response"},
+    "click_next": {"action": "click", "target": "Next", "description": "Inferred from response"},
+    "click_submit": {"action": "click", "target": "Submit", "description": "Inferred from response"},
+}
+
+
+def _extract_json_object(text: str) -> str:
+    """Returns the first complete JSON object in ``text`` via one brace-matching pass.
+
+    Unlike the old regex, this handles nested objects (the location hint) and
+    braces inside string values, and it cannot backtrack quadratically on
+    malformed responses.
+    """
+    start = text.find("{")
+    if start == -1:
+        return text
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for idx in range(start, len(text)):
+        char = text[idx]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start : idx + 1]
+
+    return text[start:]
+
+
+class _JsonCompletionTracker:
+    """Incremental version of the brace scanner: feed() returns True once the first JSON object closes."""
+
+    __slots__ = ("depth", "in_string", "escaped", "started")
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+
+    def feed(self, chunk: str) -> bool:
+        for char in chunk:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+                self.started = True
+            elif char == "}":
+                self.depth -= 1
+                if self.started and self.depth == 0:
+                    return True
+        return False
+
+
+def _json_loads(text: str) -> Any:
+    """Decodes a JSON string, preferring orjson's C parser when installed."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# Filler words that never identify a UI element.
+_KEYWORD_STOPWORDS = frozenset(
+    {
+        "the",
+        "a",
+        "an",
+        "in",
+        "on",
+        "at",
+        "to",
+        "for",
+        "of",
+        "with",
+        "button",
+        "icon",
+        "click",
+        "menu",
+        "section",
+        "page",
+    }
+)
+
+
+# Targets that name a kind of field rather than a specific one.
+_GENERIC_TYPE_KEYWORDS = frozenset(
+    {
+        "input",
+        "textarea",
+        "text field",
+        "field",
+        "text box",
+        "textbox",
+        "text input",
+        "name",
+        "title",
+        "description",
+    }
+)
+
+# Targets starting with these are treated as literal CSS/XPath selectors.
+_CSS_LIKE_PREFIXES = ("#", ".", "[", "input", "textarea", "select", "//", "div")
+
+# Static strategy tables for _execute_type; a selector of None marks a
+# locator-only strategy handled specially. Hoisted so the hot path doesn't
+# rebuild the tuples-of-tuples on every type action.
+_GENERIC_TYPE_ATTEMPTS: tuple[tuple[str, str | None], ...] = (
+    ("first visible input", "input[type='text']:visible, input:not([type]):visible"),
+    ("first visible textarea", "textarea:visible"),
+    ("first contenteditable", "[contenteditable='true']:visible"),
+    ("any input", "input[type='text'], input:not([type])"),
+    ("any textarea", "textarea"),
+    ("any contenteditable", "[contenteditable='true']"),
+    ("role textbox", None),
+)
+
+_COMMON_TYPE_ATTEMPTS: tuple[tuple[str, str | None], ...] = (
+    ("any visible input", "input:visible, textarea:visible, [contenteditable='true']:visible"),
+    ("first input or textarea", "input[type='text'], input:not([type]), textarea"),
+    ("contenteditable with placeholder", "[contenteditable='true'][placeholder]"),
+    ("any contenteditable", "[contenteditable='true']"),
+)
+
+
+@functools.lru_cache(maxsize=512)
+def _extract_keywords_cached(text: str) -> tuple[str, ...]:
+    """Keyword extraction for a lowercased phrase, memoized since Claude repeats targets across steps."""
+    words = text.split()
+
+    keywords: list[str] = []
+
+    # N-grams explode quadratically on long descriptions and rarely match
+    # whole UI labels there anyway, so only build them for short phrases.
+    if len(words) <= 15:
+        for size in (3, 2):
+            if len(words) < size:
+                continue
+            for idx in range(len(words) - size + 1):
+                chunk = words[idx : idx + size]
+                if all(word not in _KEYWORD_STOPWORDS for word in chunk):
+                    keywords.append(" ".join(chunk))
+
+    individual_words = [
+        word for word in words if word not in _KEYWORD_STOPWORDS and len(word) > 2
+    ]
+    individual_words.sort(key=len, reverse=True)
+    keywords.extend(individual_words)
+
+    return tuple(dict.fromkeys(keywords))
+
+
+def _b64encode_ascii(data: "bytes | memoryview") -> str:
+    """Base64-encodes screenshot bytes, using pybase64's SIMD encoder when installed."""
+    if pybase64 is not None:
+        return pybase64.b64encode_as_string(data)
+    # binascii is the C layer base64.b64encode wraps; calling it directly
+    # skips a Python frame per frame-encode. ASCII decode is the fast path.
+    return binascii.b2a_base64(data, newline=False).decode("ascii")
+
+# File extension per screenshot media type, used when persisting frames.
+MEDIA_TYPE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+}
+
+# Third-party requests that never affect what the vision model needs to see but
+# keep the network busy and delay networkidle.
+_BLOCKED_URL_PATTERNS = [
+    "*doubleclick*",
+    "*google-analytics*",
+    "*googletagmanager*",
+    "*facebook.net*",
+    "*hotjar*",
+]
+
+# Everything the click scorer needs (labels, text, geometry) for all clickable
+# elements, gathered in one in-page pass instead of 3 RPCs per element.
+_CLICKABLE_SELECTOR = "button, [role='button'], a, [onclick]"
+
+_COLLECT_CLICKABLES_JS = """
+(selector) => {
+    const isVisible = (el) =>
+        !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const rows = [];
+    const elements = document.querySelectorAll(selector);
+    for (let i = 0; i < elements.length; i++) {
+        const el = elements[i];
+        if (!isVisible(el)) {
+            continue;
+        }
+        const rect = el.getBoundingClientRect();
+        rows.push({
+            index: i,
+            aria: el.getAttribute('aria-label') || '',
+            text: el.innerText || '',
+            title: el.getAttribute('title') || '',
+            x: rect.x,
+            y: rect.y,
+            width: rect.width,
+            height: rect.height,
+        });
+    }
+    return rows;
+}
+"""
+
+# Runs all type-target selector probes in one in-page pass and returns the index
+# of the first selector that matches (honouring Playwright-style :visible).
+_FIND_TYPE_TARGET_JS = """
+(selectors) => {
+    const isVisible = (el) =>
+        !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    for (let i = 0; i < selectors.length; i++) {
+        const raw = selectors[i];
+        const requireVisible = raw.includes(':visible');
+        const css = raw.split(':visible').join('');
+        try {
+            for (const el of document.querySelectorAll(css)) {
+                if (!requireVisible || isVisible(el)) {
+                    return i;
+                }
+            }
+        } catch (e) {
+            continue;
+        }
+    }
+    return -1;
+}
+"""
+
+# Injected into every page so we can cheaply ask "are any fetch/XHR requests in flight?"
+# instead of sleeping a fixed amount after each action.
+_PENDING_XHR_SCRIPT = """
+(() => {
+  window.__pendingXhr = 0;
+  const origFetch = window.fetch;
+  window.fetch = function (...args) {
+    window.__pendingXhr++;
+    return origFetch.apply(this, args).finally(() => { window.__pendingXhr--; });
+  };
+  const origSend = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function (...args) {
+    window.__pendingXhr++;
+    this.addEventListener('loadend', () => { window.__pendingXhr--; });
+    return origSend.apply(this, args);
+  };
+})();
+"""
+
+# The instruction block never changes between steps; keeping it in a dedicated
+# system message lets Anthropic prompt caching serve it from cache after step 1.
+STATIC_INSTRUCTIONS = f"""INSTRUCTIONS:
+Analyze the screenshot carefully and decide the SINGLE next action.
+
+CRITICAL RULES:
+1. Respond with ONLY valid JSON - no prose, no explanations, no markdown
+2. Be SPECIFIC with your target description (button text + context/location)
+3. If you just clicked something, confirm the UI changed before clicking again
+4. Only mark \"done\" when you see clear confirmation the task succeeded
+5. Do NOT mark \"done\" until you have completed at least {Config.MIN_SUCCESSFUL_ACTIONS} successful actions (clicks, typing, or navigation)
+
+GUIDANCE FOR CLICKING:
+- Use the full button text when possible: \"Create new project\", \"Submit\", \"Save\"
+- For icon buttons, describe the function and location (e.g., \"filter button in top toolbar\")
+- Include a \"location\" hint when needed: {{"position\": \"top right toolbar\"}}
+- Avoid vague targets like \"new\" or \"button\" — be descriptive
+
+GUIDANCE FOR TYPING (IMPORTANT!):
+- Prefer selectors that point to interactive elements:
+  • \"input\" or \"textarea\" for standard text controls
+  • \"[contenteditable='true']\" for rich-text editors (Linear, Notion, etc.)
+  • \"[placeholder='Project name']\" when the placeholder text is visible
+- Do NOT use label text alone as the selector (e.g., not \"Project name\")
+- ALWAYS provide the actual text to type (e.g., \"Test Project\", \"Demo Task\", \"Sample Name\")
+- After typing, your next action should be clicking the submit button
+
+VALID ACTIONS:
+- click: Click a button, link, or element
+- type: Enter text into an input field
+- navigate: Go to a different URL
+- wait: Wait for page load (provide milliseconds)
+- done: Task is complete (only when you see success)
+
+RESPONSE FORMAT (JSON only, no markdown, no extra text):
+{{
+    \"action\": \"click|type|navigate|wait|done\",
+    \"target\": \"describe the element precisely\",
+    \"text\": \"actual text to type (REQUIRED for type actions!)\",
+    \"description\": \"brief description of why this action helps\",
+    \"location\": {{\"position\": \"top right toolbar\"}}  // optional hint that helps locate the element
+}}
+
+GOOD EXAMPLES:
+{{\"action\": \"click\", \"target\": \"create new project button\", \"description\": \"Open project creation form\"}}
+{{\"action\": \"click\", \"target\": \"settings icon\", \"description\": \"Open board settings\", \"location\": {{\"position\": \"top right toolbar\"}}}}
+{{\"action\": \"type\", \"target\": \"[contenteditable='true']\", \"text\": \"Test Project\", \"description\": \"Fill project name\"}}
+{{\"action\": \"click\", \"target\": \"submit button in project modal\", \"description\": \"Create the project\"}}
+{{\"action\": \"done\", \"description\": \"Project created successfully\"}}
+
+BAD EXAMPLES:
+{{\"action\": \"click\", \"target\": \"new\", \"description\": \"Click new\"}}  // too vague
+{{\"action\": \"type\", \"target\": \"Project name\", \"text\": \"Test\"}}  // label text is not a selector
+{{\"action\": \"click\", \"target\": \"#btn-123\"}}  // avoid internal CSS IDs"""
+
+
+# Per-thread scratch buffer for JPEG re-encodes in _downscale_for_vision.
+_ENCODE_BUF = threading.local()
+
+_CHROME_ARGS = ["--start-maximized", "--start-fullscreen", "--window-position=0,0", "--window-size=1920,1200"]
+_VIEWPORT = {"width": 1920, "height": 1080}
+
+
+def _launch_persistent_context(playwright: Any, profile_dir: Path) -> Any:
+    """Launches a persistent context on the given profile, preferring the Chrome channel."""
+    profile_dir.mkdir(parents=True, exist_ok=True)
+
+    lock_file = profile_dir / "SingletonLock"
+    if lock_file.exists():
+        lock_file.unlink(missing_ok=True)
+
+    try:
+        return playwright.chromium.launch_persistent_context(
+            user_data_dir=str(profile_dir),
+            channel="chrome",
+            headless=False,
+            args=_CHROME_ARGS,
+            viewport=_VIEWPORT,
+        )
+    except Exception:
+        logger.warning("Falling back to bundled Chromium", extra={"profile": str(profile_dir)})
+        logger.info("WARNING: Could not launch Chrome channel; falling back to bundled Chromium.")
+        return playwright.chromium.launch_persistent_context(
+            user_data_dir=str(profile_dir),
+            headless=False,
+            args=_CHROME_ARGS,
+            viewport=_VIEWPORT,
+        )
+
+
+class BrowserPool:
+    """Keeps one Playwright driver alive across captures instead of restarting it per run.
+
+    sync_playwright() spawns and tears down the driver process on every
+    capture_workflow call; for callers driving many workflows back to back
+    that startup cost dominates short runs. The pool starts the driver once
+    and hands out fresh persistent contexts per profile. Sync Playwright
+    objects are single-threaded, so use one pool per thread.
+    """
+
+    def __init__(self) -> None:
+        self._playwright: Any = None
+
+    def _driver(self) -> Any:
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        return self._playwright
+
+    @contextmanager
+    def acquire(self, profile_dir: "str | Path") -> Any:
+        """Yields a fresh persistent context for the profile and closes it on exit."""
+        context = _launch_persistent_context(self._driver(), Path(profile_dir))
+        try:
+            yield context
+        finally:
+            context.close()
+
+    def close(self) -> None:
+        """Stops the shared driver; the pool can be reused afterwards (it restarts lazily)."""
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+    def __enter__(self) -> "BrowserPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+# Distinguishes "caller didn't pass a pool" (use the one installed by
+# start(), if any) from an explicit pool=None (always own a driver per run).
+_POOL_DEFAULT: Any = object()
+
 
 class PlaywrightCapture:
     """Capture workflows using Playwright + Claude vision."""
 
     def __init__(self) -> None:
-        self.anthropic = Anthropic(api_key=Config.ANTHROPIC_API_KEY)
+        self.anthropic = _get_anthropic_client()
+        # Winning strategy per (action, target) so repeat targets (the same
+        # "Next" button across wizard screens) skip the failed-strategy scan.
+        self._strategy_cache: dict[tuple[str, str], str] = {}
+        # Owned BrowserPool between start()/stop(); None means one driver per run.
+        self._pool: BrowserPool | None = None
+
+    def start(self) -> None:
+        """Keeps a browser driver alive across subsequent capture_workflow calls.
+
+        Sequential captures then skip the per-run Playwright startup; pair
+        with stop() when the batch is done.
+        """
+        if self._pool is None:
+            self._pool = BrowserPool()
+
+    def stop(self) -> None:
+        """Releases the driver held by start(); captures fall back to one driver per run."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def capture_many(
+        self,
+        requests: List[Dict[str, Any]],
+        max_concurrency: int = 3,
+    ) -> List[Dict[str, Any]]:
+        """Runs several independent workflow captures concurrently with bounded parallelism.
+
+        Each request dict takes the same keys as ``capture_workflow`` (task,
+        app_url, app_name, optional max_steps). Every worker drives its own
+        Playwright instance, so captures targeting the same app (and thus the
+        same persistent profile) should not be run in the same batch. Claude
+        round-trips dominate per-workflow time, so throughput scales nearly
+        linearly until the browsers saturate the machine.
+        """
+        if not requests:
+            return []
+
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="workflow") as workers:
+            # pool=None overrides any pool installed by start(): sync
+            # Playwright objects are single-threaded, so the worker threads
+            # must each own their driver rather than share the instance pool.
+            futures = [
+                workers.submit(self.capture_workflow, **request, pool=None) for request in requests
+            ]
+            return [future.result() for future in futures]
 
     def capture_workflow(
         self,
@@ -40,10 +550,19 @@ class PlaywrightCapture:
         app_url: str,
         app_name: str,
         max_steps: int | None = None,
+        pool: "BrowserPool | None" = _POOL_DEFAULT,
     ) -> Dict[str, Any]:
-        """Drives the browser through the requested task, keeping screenshots and stopping if the run gets stuck."""
+        """Drives the browser through the requested task, keeping screenshots and stopping if the run gets stuck.
+
+        Pass a ``BrowserPool`` when running many captures back to back so the
+        Playwright driver is started once instead of per workflow. Leaving
+        ``pool`` unset uses the pool installed by ``start()`` (if any); an
+        explicit ``pool=None`` forces a private driver for this run.
+        """
 
         max_steps = max_steps or Config.MAX_STEPS
+        if pool is _POOL_DEFAULT:
+            pool = self._pool
 
         separator = "=" * 70
         logger.info("")
@@ -58,38 +577,41 @@ class PlaywrightCapture:
 
         screenshots: List[Dict[str, Any]] = []
         action_history: List[Dict[str, Any]] = []
+        # Pre-normalized (action, target, status) keys for O(1) loop detection.
+        recent_keys: deque[tuple[str, str, str]] = deque(maxlen=3)
+        previous_frame_hash: bytes | None = None
+        synthesized_wait = False
+        # Page title per URL, scoped to this run: most steps stay on the same
+        # page, so this turns a per-step title round-trip into a dict lookup,
+        # and concurrent capture_many runs can't clobber each other's entries.
+        title_cache: dict[str, str] = {}
+
+        # Frames spill to disk as they are captured; the in-memory list holds
+        # only references, so RSS stays flat regardless of max_steps.
+        run_dir = Path(Config.OUTPUT_DIR) / ".runs" / f"{slugify(app_name)}_{int(time.time())}"
+        run_dir.mkdir(parents=True, exist_ok=True)
+
         step_count = 0
         successful_actions = 0
         workflow_completed = False
         failure_reason = ""
 
-        with sync_playwright() as playwright:
-            profile_root = Path("auth_states")
-            profile_name = slugify(app_name) or app_name.lower()
-            profile_dir = profile_root / profile_name
-            profile_dir.mkdir(parents=True, exist_ok=True)
-
-            lock_file = profile_dir / "SingletonLock"
-            if lock_file.exists():
-                lock_file.unlink(missing_ok=True)
+        profile_root = Path("auth_states")
+        profile_name = slugify(app_name) or app_name.lower()
+        profile_dir = profile_root / profile_name
 
-            try:
-                context = playwright.chromium.launch_persistent_context(
-                    user_data_dir=str(profile_dir),
-                    channel="chrome",
-                    headless=False,
-                    args=["--start-maximized", "--start-fullscreen", "--window-position=0,0", "--window-size=1920,1200"],
-                    viewport={"width": 1920, "height": 1080},
-                )
-            except Exception:
-                logger.warning("Falling back to bundled Chromium", extra={"profile": str(profile_dir)})
-                logger.info("WARNING: Could not launch Chrome channel; falling back to bundled Chromium.")
-                context = playwright.chromium.launch_persistent_context(
-                    user_data_dir=str(profile_dir),
-                    headless=False,
-                    args=["--start-maximized", "--start-fullscreen", "--window-position=0,0", "--window-size=1920,1200"],
-                    viewport={"width": 1920, "height": 1080},
-                )
+        with ExitStack() as stack:
+            # One worker is enough — a run has at most one decision in flight —
+            # and a per-run executor means concurrent capture_many workflows
+            # never queue behind a shared pool.
+            executor = stack.enter_context(
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix="decision")
+            )
+            if pool is not None:
+                context = stack.enter_context(pool.acquire(profile_dir))
+            else:
+                playwright = stack.enter_context(sync_playwright())
+                context = _launch_persistent_context(playwright, profile_dir)
 
             if any(profile_dir.iterdir()):
                 logger.info("Using persisted Chrome profile", extra={"profile": str(profile_dir)})
@@ -101,46 +623,123 @@ class PlaywrightCapture:
                 logger.info("   Run: python scripts/setup_auth.py for best results.")
                 logger.info("")
 
+            try:
+                context.add_init_script(_PENDING_XHR_SCRIPT)
+            except Exception as exc:  # noqa: BLE001
+                logger.debug("Could not install pending-XHR tracker: %s", exc)
+
             pages = context.pages
             page = pages[0] if pages else context.new_page()
 
+            cdp = self._open_cdp_session(context, page)
+
             try:
                 logger.info("Navigating", extra={"url": app_url})
                 logger.info("Navigating to: %s", app_url)
-                page.goto(app_url, wait_until="domcontentloaded", timeout=60000)
-                page.wait_for_timeout(2000)
+                # "commit" returns as soon as navigation is committed; the
+                # short follow-up waits cover parsing and first paint without
+                # blocking on every subresource like networkidle would.
+                page.goto(app_url, wait_until="commit", timeout=60000)
+                try:
+                    page.wait_for_load_state("domcontentloaded", timeout=5000)
+                except Exception:
+                    pass
+                try:
+                    page.wait_for_function(
+                        "() => document.body && document.body.childElementCount > 0",
+                        timeout=3000,
+                    )
+                except Exception:
+                    pass
                 logger.info("Page loaded")
                 logger.info("")
 
                 for step in range(1, max_steps + 1):
                     step_count = step
-                    logger.info("%s", "─" * 70)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("%s", "─" * 70)
                     logger.info("Step %d/%d", step, max_steps)
-                    logger.info("%s", "─" * 70)
 
-                    screenshot_bytes = page.screenshot(type="png", full_page=False)
-                    screenshot_b64 = base64.b64encode(screenshot_bytes).decode("utf-8")
+                    screenshot_b64, media_type = self._capture_screenshot(page, cdp)
+
+                    # page.url is tracked client-side; the title needs a browser
+                    # round-trip, so only refresh it when the URL changes.
+                    current_url = page.url
+                    current_title = title_cache.get(current_url)
+                    if current_title is None:
+                        current_title = page.evaluate("() => document.title")
+                        title_cache[current_url] = current_title
+
+                    extension = MEDIA_TYPE_EXTENSIONS.get(media_type, "png")
+                    frame_path = run_dir / f"step_{str(step).zfill(2)}.{extension}"
+                    frame_bytes = base64.b64decode(screenshot_b64)
+                    frame_path.write_bytes(frame_bytes)
+
+                    # A cheap fingerprint of the frame lets us notice "nothing
+                    # changed" without another vision round-trip.
+                    frame_hash = hashlib.blake2b(frame_bytes[:8192], digest_size=16).digest()
 
                     screenshots.append(
                         {
                             "step": step,
-                            "data": screenshot_b64,
-                            "url": page.url,
+                            "path": str(frame_path),
+                            "media_type": media_type,
+                            "url": current_url,
                             "timestamp": time.time(),
-                            "title": page.title(),
+                            "title": current_title,
                         }
                     )
 
-                    decision = self._ask_claude(
-                        screenshot_b64,
-                        task,
-                        page.url,
-                        step,
-                        action_history,
-                    )
+                    # Deterministic short-circuit: if the last action was a wait
+                    # and the page looks exactly the same, Claude would see the
+                    # identical screenshot it already reacted to — wait once
+                    # more locally instead of paying another API round-trip.
+                    decision = None
+                    if (
+                        not synthesized_wait
+                        and action_history
+                        and action_history[-1].get("action") == "wait"
+                        and frame_hash == previous_frame_hash
+                    ):
+                        decision = {
+                            "action": "wait",
+                            "target": action_history[-1].get("target", "1000"),
+                            "text": "",
+                            "description": "Page unchanged after wait; waiting again without an API call",
+                            "location": {},
+                        }
+                        synthesized_wait = True
+                        logger.info("   Page unchanged after wait — skipping Claude call this step")
+
+                    previous_frame_hash = frame_hash
+
+                    if decision is None:
+                        synthesized_wait = False
+                        vision_b64, vision_media_type = self._downscale_for_vision(screenshot_b64, media_type)
+
+                        # Claude's round-trip dominates the step; let the page settle while it thinks.
+                        decision_future = executor.submit(
+                            self._ask_claude,
+                            vision_b64,
+                            task,
+                            current_url,
+                            step,
+                            action_history,
+                            media_type=vision_media_type,
+                        )
+
+                        try:
+                            page.wait_for_load_state("networkidle", timeout=3000)
+                        except Exception:
+                            pass
 
-                    logger.info("Action: %s", decision["action"])
-                    logger.info("Notes: %s", decision.get("description", "No description"))
+                        decision = decision_future.result()
+
+                    logger.info(
+                        "Action: %s — %s",
+                        decision["action"],
+                        decision.get("description", "No description"),
+                    )
 
                     if decision["action"] == "done":
                         if successful_actions < Config.MIN_SUCCESSFUL_ACTIONS:
@@ -170,7 +769,12 @@ class PlaywrightCapture:
                         workflow_completed = True
                         break
 
-                    if self._is_looping(action_history, decision):
+                    current_key = (
+                        decision.get("action") or "",
+                        (decision.get("target") or "").lower().strip(),
+                    )
+
+                    if self._is_looping(recent_keys, current_key):
                         logger.info("")
                         logger.info("WARNING: LOOP DETECTED!")
                         logger.info("   Same action repeated 3+ times — stopping to prevent infinite loop.")
@@ -183,12 +787,10 @@ class PlaywrightCapture:
 
                     if not success:
                         logger.info("WARNING: Action failed, continuing anyway...")
-                        logger.info("")
                         if not failure_reason:
                             failure_reason = "action_failed"
                     else:
                         logger.info("Action executed successfully")
-                        logger.info("")
                         successful_actions += 1
 
                     action_history.append(
@@ -201,13 +803,21 @@ class PlaywrightCapture:
                             "status": "success" if success else "failed",
                         }
                     )
-
-                    try:
-                        page.wait_for_load_state("networkidle", timeout=3000)
-                    except Exception:
-                        pass
-
-                    time.sleep(1)
+                    recent_keys.append((*current_key, "success" if success else "failed"))
+                    # Keep a bounded tail; only the recent entries feed the prompt
+                    # and loop detection, and the result dict doesn't need an
+                    # unbounded record for very long runs.
+                    if len(action_history) > 50:
+                        del action_history[:-50]
+
+                    if Config.EXTRA_SETTLE_MS:
+                        try:
+                            page.wait_for_function(
+                                "() => document.readyState === 'complete' && !window.__pendingXhr",
+                                timeout=Config.EXTRA_SETTLE_MS,
+                            )
+                        except Exception:
+                            pass
 
                 if not workflow_completed and not failure_reason:
                     failure_reason = "max_steps_reached"
@@ -277,10 +887,6 @@ class PlaywrightCapture:
                 logger.error("Error: %s", exc, exc_info=True)
                 logger.info("%s", separator)
                 logger.info("")
-
-                import traceback
-
-                traceback.print_exc()
                 return {
                     "success": False,
                     "method": "playwright",
@@ -294,31 +900,112 @@ class PlaywrightCapture:
                 }
 
             finally:
-                context.close()
+                if pool is None:
+                    # A pooled context is closed by BrowserPool.acquire.
+                    context.close()
                 logger.info("Browser closed")
                 logger.info("")
 
-    def _is_looping(self, history: List[Dict[str, Any]], current: Dict[str, Any]) -> bool:
-        """Checks if Claude is repeating the same move so we can bail out before wasting more steps."""
-        if len(history) < 3:
-            return False
+    @staticmethod
+    def load_screenshot_b64(path: "str | Path") -> str:
+        """Re-encodes a spilled frame for consumers that still want the base64 payload."""
+        return _b64encode_ascii(Path(path).read_bytes())
 
-        recent = history[-3:]
-        current_action = current.get("action")
-        current_target = current.get("target", "").lower().strip()
+    def _open_cdp_session(self, context: Any, page: Page) -> Any:
+        """Opens a CDP session for fast JPEG screenshots; returns None when DevTools isn't available."""
+        try:
+            cdp = context.new_cdp_session(page)
+            logger.info("Using CDP session for screenshot capture")
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Could not open CDP session, falling back to page.screenshot: %s", exc)
+            return None
 
-        same_action = all(
-            entry.get("action") == current_action
-            and entry.get("target", "").lower().strip() == current_target
-            for entry in recent
-        )
-        if not same_action:
+        if Config.BLOCK_TRACKERS:
+            try:
+                cdp.send("Network.enable")
+                cdp.send("Network.setBlockedURLs", {"urls": _BLOCKED_URL_PATTERNS})
+                logger.debug("Blocked tracker URL patterns: %s", _BLOCKED_URL_PATTERNS)
+            except Exception as exc:  # noqa: BLE001
+                logger.debug("Could not install tracker blocklist: %s", exc)
+
+        return cdp
+
+    def _capture_screenshot(self, page: Page, cdp: Any = None) -> tuple[str, str]:
+        """Grabs the current viewport as base64, preferring CDP JPEG (already base64, much faster than PNG)."""
+        if cdp is not None:
+            try:
+                params: Dict[str, Any] = {
+                    "format": "jpeg",
+                    "quality": 80,
+                    "optimizeForSpeed": True,
+                    "captureBeyondViewport": False,
+                }
+                if Config.CAPTURE_CLIP_WIDTH and Config.CAPTURE_CLIP_HEIGHT:
+                    params["clip"] = {
+                        "x": 0,
+                        "y": 0,
+                        "width": Config.CAPTURE_CLIP_WIDTH,
+                        "height": Config.CAPTURE_CLIP_HEIGHT,
+                        "scale": 1.0,
+                    }
+                result = cdp.send("Page.captureScreenshot", params)
+                return result["data"], "image/jpeg"
+            except Exception as exc:  # noqa: BLE001
+                logger.debug("CDP screenshot failed, falling back to page.screenshot: %s", exc)
+
+        screenshot_bytes = page.screenshot(type="jpeg", quality=80, full_page=False)
+        # memoryview hands the encoder the buffer without copying the JPEG first.
+        return _b64encode_ascii(memoryview(screenshot_bytes)), "image/jpeg"
+
+    def _downscale_for_vision(self, screenshot_b64: str, media_type: str) -> tuple[str, str]:
+        """Shrinks a screenshot to Config.VISION_MAX_EDGE before sending it to Claude.
+
+        The full-resolution frame stays in the workflow record; only the copy
+        uploaded for the vision decision is downscaled. Returns the input
+        unchanged when Pillow is unavailable or the frame is already small.
+        """
+        if Image is None:
+            return screenshot_b64, media_type
+
+        max_edge = Config.VISION_MAX_EDGE
+        try:
+            img = Image.open(io.BytesIO(base64.b64decode(screenshot_b64)))
+            if max(img.size) <= max_edge:
+                return screenshot_b64, media_type
+
+            img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+            # Reuse one buffer per thread instead of allocating a fresh ~1 MB
+            # BytesIO at step cadence (thread-local because capture_many runs
+            # captures concurrently).
+            buf = getattr(_ENCODE_BUF, "buf", None)
+            if buf is None:
+                buf = _ENCODE_BUF.buf = io.BytesIO()
+            buf.seek(0)
+            buf.truncate()
+            img.convert("RGB").save(buf, "JPEG", quality=Config.VISION_JPEG_QUALITY)
+            return _b64encode_ascii(buf.getbuffer()), "image/jpeg"
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Screenshot downscale failed, sending original: %s", exc)
+            return screenshot_b64, media_type
+
+    def _is_looping(
+        self,
+        recent_keys: "deque[tuple[str, str, str]]",
+        current_key: tuple[str, str],
+    ) -> bool:
+        """Checks if Claude is repeating the same move so we can bail out before wasting more steps.
+
+        Keys are normalized once when appended, so the check is three tuple
+        comparisons instead of re-lowercasing history entries every step.
+        """
+        if len(recent_keys) < 3:
             return False
 
-        all_succeeded = all(entry.get("status") == "success" for entry in recent)
-        if all_succeeded:
+        if any((action, target) != current_key for action, target, _ in recent_keys):
+            return False
+
+        if all(status == "success" for _, _, status in recent_keys):
             logger.info("   WARNING: Repeating successful actions without visible change")
-            return True
 
         return True
 
@@ -365,53 +1052,81 @@ class PlaywrightCapture:
         if target:
             logger.info("   Target requested: '%s'", target)
 
+        # One or_-union locator probes all three exact strategies in a single
+        # round-trip instead of three sequential locator attempts. (A comma
+        # union can't express this: a leading text= engine swallows the whole
+        # string as one literal matcher, so the commas never split it.)
         exact_strategies: list[tuple[str, callable]] = []
         if target:
             exact_strategies = [
-                ("exact text", lambda: page.get_by_text(target, exact=True).first.click(timeout=3000)),
-                ("exact aria-label", lambda: page.locator(f"[aria-label=\"{target}\"]").first.click(timeout=3000)),
-                ("exact button text", lambda: page.locator(f"button:has-text('{target}')").first.click(timeout=3000)),
+                (
+                    "exact match",
+                    lambda: page.get_by_text(target, exact=True)
+                    .or_(page.locator(f"[aria-label=\"{target}\"]"))
+                    .or_(page.locator(f"button:has-text('{target}')")),
+                ),
             ]
 
-        for name, strategy in exact_strategies:
-            try:
-                strategy()
-                logger.info("Click success", extra={"strategy": name, "target": target})
-                logger.info("   Clicked via %s", name)
+        fallback_strategies: list[tuple[str, callable]] = []
+        if target:
+            fallback_strategies = [
+                ("partial text", lambda: page.get_by_text(target)),
+                (
+                    "link or button",
+                    lambda: page.locator(f"a:has-text('{target}'), button:has-text('{target}')"),
+                ),
+                ("CSS selector", lambda: page.locator(target)),
+                ("aria-label", lambda: page.locator(f"[aria-label*='{target}' i]")),
+                ("role button", lambda: page.get_by_role("button", name=target)),
+            ]
+
+        named_strategies = dict(exact_strategies) | dict(fallback_strategies)
+
+        cache_key = ("click", target.lower()) if target else None
+        cached_name = self._strategy_cache.get(cache_key) if cache_key else None
+        if cached_name and cached_name in named_strategies:
+            if self._probe_and_click(named_strategies[cached_name], f"cached {cached_name}", target):
+                return True
+
+        for name, build_locator in exact_strategies:
+            if self._probe_and_click(build_locator, name, target):
+                self._remember_strategy(cache_key, name)
                 return True
-            except Exception:
-                continue
 
         combined_text = " ".join(filter(None, [target, description]))
         keywords = self._extract_keywords(combined_text)
         logger.debug("Derived keywords for click: %s", keywords[:5])
 
+        # One in-page pass returns labels, text, and geometry for every visible
+        # clickable; the old version made three RPCs per element just for the
+        # attributes, then more for bounding boxes in the spatial fallback.
+        clickable_rows: list[Dict[str, Any]] = []
         try:
-            clickables = page.locator(
-                "button:visible, [role='button']:visible, a:visible, [onclick]:visible"
-            ).all()
+            clickable_rows = page.evaluate(_COLLECT_CLICKABLES_JS, _CLICKABLE_SELECTOR)
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Clickable element scan failed: %s", exc)
 
-            scored_matches: list[tuple[int, Any, str]] = []
-            for element in clickables:
-                try:
-                    aria_label = element.get_attribute("aria-label") or ""
-                    text_content = element.inner_text() or ""
-                    title_attr = element.get_attribute("title") or ""
-                    combined = " ".join(filter(None, [aria_label, text_content, title_attr]))
-                    if not combined:
-                        continue
-                    score = self._score_element_match(combined, keywords)
-                    if score > 0:
-                        scored_matches.append((score, element, combined))
-                except Exception:
+        try:
+            # Single pass tracking the best candidate; an exact-text match
+            # (200 bonus + at least one keyword hit) can't be beaten, so stop
+            # scanning the moment one appears.
+            top_score = 0
+            top_row: Dict[str, Any] | None = None
+            top_text = ""
+            for row in clickable_rows:
+                combined = " ".join(filter(None, [row["aria"], row["text"], row["title"]]))
+                if not combined:
                     continue
+                score = self._score_element_match(combined, keywords)
+                if score > top_score:
+                    top_score, top_row, top_text = score, row, combined
+                    if score >= 210:
+                        break
 
-            if scored_matches:
-                scored_matches.sort(key=lambda item: item[0], reverse=True)
-                top_score, top_element, top_text = scored_matches[0]
+            if top_row is not None:
                 logger.debug("Top semantic match score=%s text='%s'", top_score, top_text[:80])
                 if top_score >= 50:
-                    top_element.click(timeout=3000)
+                    page.locator(_CLICKABLE_SELECTOR).nth(top_row["index"]).click(timeout=3000)
                     logger.info(
                         "Click success",
                         extra={"strategy": "semantic match", "target": target, "score": top_score},
@@ -423,11 +1138,10 @@ class PlaywrightCapture:
 
         if location_hint:
             try:
-                candidates = page.locator("button, [role='button'], [aria-role='button'], a").all()
                 viewport = page.viewport_size or {}
-                spatial_match = self._find_best_spatial_match(candidates, location_hint, viewport)
-                if spatial_match:
-                    spatial_match.click(timeout=3000)
+                spatial_match = self._find_best_spatial_match(clickable_rows, location_hint, viewport)
+                if spatial_match is not None:
+                    page.locator(_CLICKABLE_SELECTOR).nth(spatial_match["index"]).click(timeout=3000)
                     logger.info(
                         "Click success",
                         extra={"strategy": "spatial match", "target": target, "location_hint": location_hint},
@@ -438,45 +1152,17 @@ class PlaywrightCapture:
                 logger.debug("Spatial click attempt failed: %s", exc)
 
         for keyword in keywords[:3]:
-            for strategy_name, selector_builder in (
-                (f"aria-label contains '{keyword}'", lambda k=keyword: f"[aria-label*=\"{k}\" i]"),
-                (f"text contains '{keyword}'", lambda k=keyword: k),
+            for strategy_name, build_locator in (
+                (f"aria-label contains '{keyword}'", lambda k=keyword: page.locator(f"[aria-label*=\"{k}\" i]")),
+                (f"text contains '{keyword}'", lambda k=keyword: page.get_by_text(k, exact=False)),
             ):
-                try:
-                    if strategy_name.startswith("aria-label"):
-                        page.locator(selector_builder()).first.click(timeout=3000)
-                    else:
-                        page.get_by_text(selector_builder(), exact=False).first.click(timeout=3000)
-                    logger.info(
-                        "Click success",
-                        extra={"strategy": strategy_name, "target": target, "keyword": keyword},
-                    )
-                    logger.info("   Clicked via %s", strategy_name)
+                if self._probe_and_click(build_locator, strategy_name, target):
                     return True
-                except Exception:
-                    continue
-
-        fallback_strategies: list[tuple[str, callable]] = []
-        if target:
-            fallback_strategies = [
-                ("partial text", lambda: page.get_by_text(target).first.click(timeout=5000)),
-                (
-                    "link or button",
-                    lambda: page.locator(f"a:has-text('{target}'), button:has-text('{target}')").first.click(timeout=5000),
-                ),
-                ("CSS selector", lambda: page.locator(target).first.click(timeout=5000)),
-                ("aria-label", lambda: page.locator(f"[aria-label*='{target}' i]").first.click(timeout=5000)),
-                ("role button", lambda: page.get_by_role("button", name=target).first.click(timeout=5000)),
-            ]
 
-        for name, action in fallback_strategies:
-            try:
-                action()
-                logger.info("Click success", extra={"strategy": name, "target": target})
-                logger.info("   Clicked via %s: '%s'", name, target)
+        for name, build_locator in fallback_strategies:
+            if self._probe_and_click(build_locator, name, target):
+                self._remember_strategy(cache_key, name)
                 return True
-            except Exception:
-                continue
 
         logger.warning(
             "Click strategies exhausted",
@@ -485,57 +1171,36 @@ class PlaywrightCapture:
         logger.info("   Could not click '%s'", target or description)
         return False
 
+    def _remember_strategy(self, cache_key: tuple[str, str] | None, strategy_name: str) -> None:
+        """Records the strategy that worked for a target so the next attempt tries it first."""
+        if cache_key is None:
+            return
+        if len(self._strategy_cache) >= 100 and cache_key not in self._strategy_cache:
+            self._strategy_cache.pop(next(iter(self._strategy_cache)))
+        self._strategy_cache[cache_key] = strategy_name
+
+    def _probe_and_click(self, build_locator: Any, strategy_name: str, target: str) -> bool:
+        """Checks a strategy's locator actually matches something before spending a click timeout on it.
+
+        count() is a cheap single round-trip, so a missing target costs
+        milliseconds instead of a multi-second click timeout per strategy.
+        """
+        try:
+            locator = build_locator()
+            if locator.count() == 0:
+                return False
+            locator.first.click(timeout=750)
+            logger.info("Click success", extra={"strategy": strategy_name, "target": target})
+            logger.info("   Clicked via %s", strategy_name)
+            return True
+        except Exception:
+            return False
+
     def _extract_keywords(self, text: str) -> List[str]:
         """Picks out the juicy words Claude mentioned so we can match them to UI elements."""
         if not text:
             return []
-
-        text = text.lower()
-        words = text.split()
-
-        stopwords = {
-            "the",
-            "a",
-            "an",
-            "in",
-            "on",
-            "at",
-            "to",
-            "for",
-            "of",
-            "with",
-            "button",
-            "icon",
-            "click",
-            "menu",
-            "section",
-            "page",
-        }
-
-        keywords: list[str] = []
-
-        for size in (3, 2):
-            if len(words) < size:
-                continue
-            for idx in range(len(words) - size + 1):
-                chunk = words[idx : idx + size]
-                if all(word not in stopwords for word in chunk):
-                    keywords.append(" ".join(chunk))
-
-        individual_words = [
-            word for word in words if word not in stopwords and len(word) > 2
-        ]
-        individual_words.sort(key=len, reverse=True)
-        keywords.extend(individual_words)
-
-        seen: set[str] = set()
-        ordered_keywords: list[str] = []
-        for keyword in keywords:
-            if keyword not in seen:
-                seen.add(keyword)
-                ordered_keywords.append(keyword)
-
-        return ordered_keywords
+        return list(_extract_keywords_cached(text.lower()))
 
     def _score_element_match(self, element_text: str, keywords: List[str]) -> int:
         """Gives a rough relevance score so we can choose the click target that feels most on-topic."""
@@ -559,12 +1224,16 @@ class PlaywrightCapture:
 
     def _find_best_spatial_match(
         self,
-        elements: List[Any],
+        rows: List[Dict[str, Any]],
         location_hint: Dict[str, Any],
         viewport: Dict[str, int] | None,
-    ) -> Any:
-        """Uses Claude's rough location hint (top, bottom, etc.) to guess which element they meant."""
-        if not elements or not viewport:
+    ) -> Dict[str, Any] | None:
+        """Uses Claude's rough location hint (top, bottom, etc.) to guess which element they meant.
+
+        Works on the rows from the batched clickable scan, whose rects were
+        measured in-page, so no bounding_box() round-trips are needed here.
+        """
+        if not rows or not viewport:
             return None
 
         position_hint = (location_hint.get("position") or "").lower()
@@ -576,33 +1245,25 @@ class PlaywrightCapture:
         if not width or not height:
             return None
 
-        scored: List[tuple[int, Any]] = []
-
-        for element in elements:
-            try:
-                box = element.bounding_box()
-            except Exception:  # noqa: BLE001
-                continue
-
-            if not box:
-                continue
+        scored: List[tuple[int, Dict[str, Any]]] = []
 
+        for row in rows:
             score = 0
-            if "top" in position_hint and box["y"] <= height * 0.2:
+            if "top" in position_hint and row["y"] <= height * 0.2:
                 score += 10
-            if "bottom" in position_hint and box["y"] >= height * 0.7:
+            if "bottom" in position_hint and row["y"] >= height * 0.7:
                 score += 10
-            if "left" in position_hint and box["x"] <= width * 0.3:
+            if "left" in position_hint and row["x"] <= width * 0.3:
                 score += 10
-            if "right" in position_hint and box["x"] >= width * 0.7:
+            if "right" in position_hint and row["x"] >= width * 0.7:
                 score += 10
-            if "center" in position_hint and width * 0.3 < box["x"] < width * 0.7:
+            if "center" in position_hint and width * 0.3 < row["x"] < width * 0.7:
                 score += 5
-            if "toolbar" in position_hint and box["y"] <= 100:
+            if "toolbar" in position_hint and row["y"] <= 100:
                 score += 15
 
             if score > 0:
-                scored.append((score, element))
+                scored.append((score, row))
 
         if not scored:
             return None
@@ -612,23 +1273,21 @@ class PlaywrightCapture:
 
     def _wait_for_state_change(self, page: Page, previous_url: str, timeout_ms: int = 2000) -> bool:
         """Gives the page a moment to react after an action so we can detect when something actually changed."""
-        timeout_s = timeout_ms / 1000
-        start = time.time()
-        while time.time() - start < timeout_s:
-            if page.url != previous_url:
-                logger.info("   URL changed to: %s", page.url)
-                return True
-            time.sleep(0.1)
+        try:
+            # Event-driven: resolves the instant the URL changes instead of
+            # polling every 100ms and paying up to a full poll interval extra.
+            page.wait_for_url(lambda url: url != previous_url, timeout=timeout_ms)
+            logger.info("   URL changed to: %s", page.url)
+            return True
+        except Exception:
+            pass
 
         try:
             page.wait_for_load_state("networkidle", timeout=timeout_ms)
             logger.info("   Page activity detected after action")
             return True
         except Exception:
-            pass
-
-        page.wait_for_timeout(300)
-        return False
+            return False
 
     def _execute_type(self, page: Page, target: str, text: str) -> bool:
         """Finds the best input field candidate and types in the text, falling back to keyboard events if needed."""
@@ -641,38 +1300,15 @@ class PlaywrightCapture:
             logger.warning("Type action missing text; defaulting", extra={"target": target})
             text = "Test Project"
 
-        generic_keywords = {
-            "input",
-            "textarea",
-            "text field",
-            "field",
-            "text box",
-            "textbox",
-            "text input",
-            "name",
-            "title",
-            "description",
-        }
         target_normalized = target.lower().strip()
-        is_generic = target_normalized in generic_keywords
+        is_generic = target_normalized in _GENERIC_TYPE_KEYWORDS
 
-        css_like_prefixes = ("#", ".", "[", "input", "textarea", "select", "//", "div")
-        is_css_selector = any(target.startswith(prefix) for prefix in css_like_prefixes)
+        is_css_selector = any(target.startswith(prefix) for prefix in _CSS_LIKE_PREFIXES)
 
         attempts: list[tuple[str, str | None]] = []
 
         if is_generic:
-            attempts.extend(
-                [
-                    ("first visible input", "input[type='text']:visible, input:not([type]):visible"),
-                    ("first visible textarea", "textarea:visible"),
-                    ("first contenteditable", "[contenteditable='true']:visible"),
-                    ("any input", "input[type='text'], input:not([type])"),
-                    ("any textarea", "textarea"),
-                    ("any contenteditable", "[contenteditable='true']"),
-                    ("role textbox", None),
-                ]
-            )
+            attempts.extend(_GENERIC_TYPE_ATTEMPTS)
         elif is_css_selector:
             attempts.append(("css selector", target))
         else:
@@ -690,14 +1326,7 @@ class PlaywrightCapture:
                 ]
             )
 
-        attempts.extend(
-            [
-                ("any visible input", "input:visible, textarea:visible, [contenteditable='true']:visible"),
-                ("first input or textarea", "input[type='text'], input:not([type]), textarea"),
-                ("contenteditable with placeholder", "[contenteditable='true'][placeholder]"),
-                ("any contenteditable", "[contenteditable='true']"),
-            ]
-        )
+        attempts.extend(_COMMON_TYPE_ATTEMPTS)
 
         seen: set[tuple[str, str | None]] = set()
         ordered_attempts: list[tuple[str, str | None]] = []
@@ -710,56 +1339,69 @@ class PlaywrightCapture:
 
         last_error: Exception | None = None
 
+        cache_key = ("type", target.lower()) if target else None
+        cached_selector = self._strategy_cache.get(cache_key) if cache_key else None
+        if cached_selector:
+            try:
+                # count() first: on a stale entry (same target string, different
+                # screen) an unprobed fill would burn its timeouts and then the
+                # keyboard fallback would type into whatever has focus and
+                # report success. A miss falls through to the normal scan.
+                locator = page.locator(cached_selector)
+                if locator.count() > 0 and self._fill_or_keyboard(
+                    page, locator.first, "cached selector", cached_selector, target, text
+                ):
+                    return True
+            except Exception:  # noqa: BLE001
+                pass
+
+        # Probe every CSS strategy in a single in-page scan instead of paying a
+        # wait_for timeout per selector over the driver pipe.
+        css_attempts = [(name, selector) for name, selector in ordered_attempts if selector]
+        if css_attempts:
+            try:
+                match_index = page.evaluate(_FIND_TYPE_TARGET_JS, [s for _, s in css_attempts])
+            except Exception as exc:  # noqa: BLE001
+                logger.debug("In-page type-target scan failed: %s", exc)
+                match_index = -1
+
+            if match_index >= 0:
+                strategy_name, selector = css_attempts[match_index]
+                if self._fill_or_keyboard(page, page.locator(selector).first, strategy_name, selector, target, text):
+                    self._remember_strategy(cache_key, selector)
+                    return True
+            else:
+                # querySelectorAll can't evaluate non-CSS selectors (an XPath
+                # target throws inside the scan) and the whole evaluate can die
+                # mid-navigation; retry the same list through Playwright, whose
+                # selector engines handle both, before giving up on selectors.
+                for strategy_name, selector in css_attempts:
+                    try:
+                        locator = page.locator(selector)
+                        if locator.count() == 0:
+                            continue
+                        if self._fill_or_keyboard(page, locator.first, strategy_name, selector, target, text):
+                            self._remember_strategy(cache_key, selector)
+                            return True
+                    except Exception as exc:  # noqa: BLE001
+                        last_error = exc
+                        continue
+
+        # Locator-only strategies (roles, labels) still go through Playwright,
+        # but with a short attach budget now that the CSS scan already ran.
         for strategy_name, selector in ordered_attempts:
+            if selector:
+                continue
             try:
                 if strategy_name == "role textbox":
                     locator = page.get_by_role("textbox").first
                 elif strategy_name == "label text":
                     locator = page.get_by_label(target).first
-                elif selector:
-                    locator = page.locator(selector).first
                 else:
                     continue
 
-                locator.wait_for(state="attached", timeout=5000)
-
-                try:
-                    locator.fill(text, timeout=3000)
-                    logger.info(
-                        "Type success",
-                        extra={
-                            "strategy": strategy_name,
-                            "target": target,
-                            "selector": selector,
-                            "value": text,
-                        },
-                    )
-                    logger.info("   Typed '%s' using %s", text, strategy_name)
-                    return True
-                except Exception:
-                    try:
-                        locator.click(timeout=2000)
-                    except Exception:
-                        pass
-
-                    for combo in ("Meta+A", "Control+A"):
-                        try:
-                            page.keyboard.press(combo)
-                            break
-                        except Exception:
-                            continue
-
-                    page.keyboard.type(text, delay=50)
-                    logger.info(
-                        "Type success (keyboard fallback)",
-                        extra={
-                            "strategy": strategy_name,
-                            "target": target,
-                            "selector": selector,
-                            "value": text,
-                        },
-                    )
-                    logger.info("   Typed '%s' using %s (keyboard fallback)", text, strategy_name)
+                locator.wait_for(state="attached", timeout=1000)
+                if self._fill_or_keyboard(page, locator, strategy_name, selector, target, text):
                     return True
             except Exception as exc:  # noqa: BLE001
                 last_error = exc
@@ -781,6 +1423,59 @@ class PlaywrightCapture:
 
         return False
 
+    def _fill_or_keyboard(
+        self,
+        page: Page,
+        locator: Any,
+        strategy_name: str,
+        selector: str | None,
+        target: str,
+        text: str,
+    ) -> bool:
+        """Fills the located field, falling back to focus + keyboard events for rich-text editors."""
+        try:
+            locator.fill(text, timeout=3000)
+            logger.info(
+                "Type success",
+                extra={
+                    "strategy": strategy_name,
+                    "target": target,
+                    "selector": selector,
+                    "value": text,
+                },
+            )
+            logger.info("   Typed '%s' using %s", text, strategy_name)
+            return True
+        except Exception:
+            try:
+                locator.click(timeout=2000)
+            except Exception:
+                pass
+
+            for combo in ("Meta+A", "Control+A"):
+                try:
+                    page.keyboard.press(combo)
+                    break
+                except Exception:
+                    continue
+
+            try:
+                page.keyboard.type(text, delay=Config.TYPE_DELAY_MS)
+            except Exception:
+                return False
+
+            logger.info(
+                "Type success (keyboard fallback)",
+                extra={
+                    "strategy": strategy_name,
+                    "target": target,
+                    "selector": selector,
+                    "value": text,
+                },
+            )
+            logger.info("   Typed '%s' using %s (keyboard fallback)", text, strategy_name)
+            return True
+
     def _ask_claude(
         self,
         screenshot: str,
@@ -788,11 +1483,26 @@ class PlaywrightCapture:
         current_url: str,
         step: int,
         action_history: List[Dict[str, Any]] | None = None,
+        media_type: str = "image/png",
     ) -> Dict[str, Any]:
         """Sends the latest screenshot and context to Claude and returns whatever action it wants to try next."""
-        response = self.anthropic.messages.create(
+        prompt = self._build_prompt(task, current_url, step, action_history)
+
+        # Stream the response and stop reading the moment the decision object
+        # closes; anything the model generates after the JSON is wasted
+        # latency we'd otherwise sit through.
+        parts: list[str] = []
+        tracker = _JsonCompletionTracker()
+        with self.anthropic.messages.stream(
             model=Config.ANTHROPIC_MODEL,
-            max_tokens=1024,
+            max_tokens=Config.DECISION_MAX_TOKENS,
+            system=[
+                {
+                    "type": "text",
+                    "text": STATIC_INSTRUCTIONS,
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ],
             messages=[
                 {
                     "role": "user",
@@ -801,21 +1511,40 @@ class PlaywrightCapture:
                             "type": "image",
                             "source": {
                                 "type": "base64",
-                                "media_type": "image/png",
+                                "media_type": media_type,
                                 "data": screenshot,
                             },
                         },
                         {
                             "type": "text",
-                            "text": self._build_prompt(task, current_url, step, action_history),
+                            "text": prompt,
                         },
                     ],
                 }
             ],
-        )
+        ) as stream:
+            for chunk in stream.text_stream:
+                parts.append(chunk)
+                if tracker.feed(chunk):
+                    break
+            # Input-side usage arrives in the message_start event, so the
+            # snapshot has it even when we cut the stream at the closing brace
+            # (the common case; output_tokens is then the count so far).
+            snapshot = getattr(stream, "current_message_snapshot", None)
+            usage = getattr(snapshot, "usage", None)
+            if usage is not None:
+                # cache_read should dominate cache_creation from step 2
+                # onwards; if it doesn't, the cached prefix is being
+                # invalidated somewhere.
+                logger.debug(
+                    "Claude usage: input=%s output=%s cache_read=%s cache_creation=%s",
+                    getattr(usage, "input_tokens", None),
+                    getattr(usage, "output_tokens", None),
+                    getattr(usage, "cache_read_input_tokens", None),
+                    getattr(usage, "cache_creation_input_tokens", None),
+                )
 
-        text = response.content[0].text
-        return self._parse_decision(text)
+        return self._parse_decision("".join(parts))
 
     def _build_prompt(
         self,
@@ -824,30 +1553,33 @@ class PlaywrightCapture:
         step: int,
         action_history: List[Dict[str, Any]] | None = None,
     ) -> str:
-        """Build improved prompt with better typing guidance."""
+        """Builds the small per-step prompt; the static instructions live in the cached system block."""
 
         history_text = ""
         if action_history:
-            recent = action_history[-3:]
-            if recent:
-                lines = ["", "WARNING: ACTIONS ALREADY TAKEN (do NOT repeat unless necessary):"]
-                for idx, act in enumerate(recent, start=1):
-                    action_desc = act.get("action", "")
-                    target = act.get("target", "")
-                    if target:
-                        action_desc += f" → {target[:50]}"
-                    text_value = act.get("text")
-                    if text_value:
-                        action_desc += f" (text: {text_value[:30]})"
-                    lines.append(f"  {idx}. {action_desc}")
-                lines.extend(
-                    [
-                        "",
-                        "CRITICAL: If you just TYPED in a field, your next action should be CLICK the submit/next button!",
-                        "DO NOT type the same thing into the same field multiple times!",
-                    ]
-                )
-                history_text = "\n".join(lines)
+            # islice views instead of slice copies; this runs every step.
+            split = max(0, len(action_history) - 5)
+            older_summary = self._summarize_old(action_history, split)
+            lines = ["", "WARNING: ACTIONS ALREADY TAKEN (do NOT repeat unless necessary):"]
+            if older_summary:
+                lines.append(f"  {older_summary}")
+            for idx, act in enumerate(islice(action_history, split, None), start=1):
+                action_desc = act.get("action", "")
+                target = act.get("target", "")
+                if target:
+                    action_desc += f" → {target[:50]}"
+                text_value = act.get("text")
+                if text_value:
+                    action_desc += f" (text: {text_value[:30]})"
+                lines.append(f"  {idx}. {action_desc}")
+            lines.extend(
+                [
+                    "",
+                    "CRITICAL: If you just TYPED in a field, your next action should be CLICK the submit/next button!",
+                    "DO NOT type the same thing into the same field multiple times!",
+                ]
+            )
+            history_text = "\n".join(lines)
 
         prompt = f"""TASK TO ACCOMPLISH: {task}
 
@@ -856,91 +1588,41 @@ CURRENT STATE:
 - Step: {step}
 {history_text}
 
-INSTRUCTIONS:
-Analyze the screenshot carefully and decide the SINGLE next action.
-
-CRITICAL RULES:
-1. Respond with ONLY valid JSON - no prose, no explanations, no markdown
-2. Be SPECIFIC with your target description (button text + context/location)
-3. If you just clicked something, confirm the UI changed before clicking again
-4. Only mark \"done\" when you see clear confirmation the task succeeded
-5. Do NOT mark \"done\" until you have completed at least {Config.MIN_SUCCESSFUL_ACTIONS} successful actions (clicks, typing, or navigation)
-
-GUIDANCE FOR CLICKING:
-- Use the full button text when possible: \"Create new project\", \"Submit\", \"Save\"
-- For icon buttons, describe the function and location (e.g., \"filter button in top toolbar\")
-- Include a \"location\" hint when needed: {{"position\": \"top right toolbar\"}}
-- Avoid vague targets like \"new\" or \"button\" — be descriptive
-
-GUIDANCE FOR TYPING (IMPORTANT!):
-- Prefer selectors that point to interactive elements:
-  • \"input\" or \"textarea\" for standard text controls
-  • \"[contenteditable='true']\" for rich-text editors (Linear, Notion, etc.)
-  • \"[placeholder='Project name']\" when the placeholder text is visible
-- Do NOT use label text alone as the selector (e.g., not \"Project name\")
-- ALWAYS provide the actual text to type (e.g., \"Test Project\", \"Demo Task\", \"Sample Name\")
-- After typing, your next action should be clicking the submit button
-
-VALID ACTIONS:
-- click: Click a button, link, or element
-- type: Enter text into an input field
-- navigate: Go to a different URL
-- wait: Wait for page load (provide milliseconds)
-- done: Task is complete (only when you see success)
-
-RESPONSE FORMAT (JSON only, no markdown, no extra text):
-{{
-    \"action\": \"click|type|navigate|wait|done\",
-    \"target\": \"describe the element precisely\",
-    \"text\": \"actual text to type (REQUIRED for type actions!)\",
-    \"description\": \"brief description of why this action helps\",
-    \"location\": {{\"position\": \"top right toolbar\"}}  // optional hint that helps locate the element
-}}
+RESPOND WITH ONLY THE JSON:"""
 
-GOOD EXAMPLES:
-{{\"action\": \"click\", \"target\": \"create new project button\", \"description\": \"Open project creation form\"}}
-{{\"action\": \"click\", \"target\": \"settings icon\", \"description\": \"Open board settings\", \"location\": {{\"position\": \"top right toolbar\"}}}}
-{{\"action\": \"type\", \"target\": \"[contenteditable='true']\", \"text\": \"Test Project\", \"description\": \"Fill project name\"}}
-{{\"action\": \"click\", \"target\": \"submit button in project modal\", \"description\": \"Create the project\"}}
-{{\"action\": \"done\", \"description\": \"Project created successfully\"}}
+        return prompt
 
-BAD EXAMPLES:
-{{\"action\": \"click\", \"target\": \"new\", \"description\": \"Click new\"}}  // too vague
-{{\"action\": \"type\", \"target\": \"Project name\", \"text\": \"Test\"}}  // label text is not a selector
-{{\"action\": \"click\", \"target\": \"#btn-123\"}}  // avoid internal CSS IDs
+    @staticmethod
+    def _summarize_old(action_history: List[Dict[str, Any]], end: int) -> str:
+        """Collapses history before ``end`` into one line so prompt size stays flat."""
+        if end <= 0:
+            return ""
 
-RESPOND WITH ONLY THE JSON:"""
+        succeeded = 0
+        counts: Dict[str, int] = {}
+        for act in islice(action_history, end):
+            if act.get("status") == "success":
+                succeeded += 1
+            name = act.get("action") or "unknown"
+            counts[name] = counts.get(name, 0) + 1
 
-        return prompt
+        breakdown = ", ".join(f"{count}x {name}" for name, count in counts.items())
+        return f"(earlier: {end} actions, {succeeded} succeeded — {breakdown})"
 
     def _parse_decision(self, text: str) -> Dict[str, Any]:
         text = text.strip()
 
-        json_match = re.search(r"\{[^{}]*\"action\"[^{}]*\}", text, re.DOTALL)
-        if json_match:
-            text = json_match.group(0)
-
         try:
-            if "```json" in text:
-                json_str = text.split("```json", 1)[1].split("```", 1)[0].strip()
-            elif "```" in text:
-                json_str = text.split("```", 1)[1].split("```", 1)[0].strip()
-            else:
-                json_str = text
-            decision = json.loads(json_str)
+            fence_match = _FENCE_RE.search(text)
+            json_str = fence_match.group(1) if fence_match else _extract_json_object(text)
+            decision = _json_loads(json_str)
         except Exception as exc:  # noqa: BLE001
             logger.error("Claude JSON parse error", extra={"error": str(exc), "raw": text[:200]})
             logger.info("WARNING: JSON parse error: %s", exc)
             logger.info("   Raw response: %s...", text[:200])
-            text_lower = text.lower()
-            if any(word in text_lower for word in ["done", "complete", "success"]):
-                decision = {"action": "done", "description": "Inferred completion from response"}
-            elif any(word in text_lower for word in ["login", "sign in", "authenticate"]):
-                decision = {"action": "done", "description": "Login required - stopping"}
-            elif "click" in text_lower and "next" in text_lower:
-                decision = {"action": "click", "target": "Next", "description": "Inferred from response"}
-            elif "click" in text_lower and "submit" in text_lower:
-                decision = {"action": "click", "target": "Submit", "description": "Inferred from response"}
+            match = _FALLBACK_RE.search(text)
+            if match:
+                decision = dict(_FALLBACK_DECISIONS[match.lastgroup])
             else:
                 decision = {"action": "done", "description": "Parse error - stopping workflow"}
 
@@ -952,4 +1634,4 @@ RESPOND WITH ONLY THE JSON:"""
         return decision
 
 
-__all__ = ["PlaywrightCapture"]
+__all__ = ["BrowserPool", "PlaywrightCapture"]
@@ -5,6 +5,7 @@ Receives tasks from Agent A and captures workflows.
 
 from __future__ import annotations
 
+import threading
 from typing import Any, Dict
 
 import logging
@@ -25,10 +26,24 @@ class AgentB:
         self.capture = PlaywrightCapture()
         self.storage = WorkflowStorage(base_dir=Config.OUTPUT_DIR)
 
+        # Warm the TLS connection to the API while the user is still typing,
+        # so the first decision call starts on an already-pooled socket.
+        threading.Thread(target=self._prewarm_api, daemon=True).start()
+
         logger.info("Agent B initialized")
         logger.info("   Ready to receive tasks from Agent A")
         logger.info("")
 
+    def _prewarm_api(self) -> None:
+        """Opens a keep-alive connection to api.anthropic.com ahead of the first real call."""
+        try:
+            # Absolute URL: the pooled httpx client has no base_url (the SDK
+            # builds full URLs itself), so a bare path never reaches a socket.
+            self.capture.anthropic._client.get("https://api.anthropic.com/v1/models")
+        except Exception:  # noqa: BLE001
+            # Best-effort: the handshake is the point, not the response.
+            pass
+
     def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Figures out the right app context, hands the task to Playwright, and bundles the capture results."""
 
@@ -82,13 +97,14 @@ class AgentB:
             if result.get("success"):
                 output_dir = self.storage.save_workflow(result)
                 result["output_dir"] = str(output_dir)
+            else:
+                # Failed runs are never saved; drop their spilled frames so
+                # they don't pile up under output/.runs.
+                self.storage.discard_workflow(result)
             return result
         except Exception as exc:
             logger.info("")
             logger.error("Unexpected error: %s", exc, exc_info=True)
-            import traceback
-
-            traceback.print_exc()
             return {"success": False, "error": str(exc), "task": task, "app": app_name}
 
 
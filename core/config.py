@@ -1,7 +1,9 @@
 """Configuration management."""
 
 import os
+import sys
 from pathlib import Path
+from types import MappingProxyType
 
 from dotenv import load_dotenv
 
@@ -14,18 +16,49 @@ class Config:
     ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
     ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
 
+    # Generation budget for a decision; the response schema is a small JSON
+    # object, so anything near 1024 just lets the model ramble.
+    DECISION_MAX_TOKENS = int(os.getenv("DECISION_MAX_TOKENS", "256"))
+
     OUTPUT_DIR = os.getenv("OUTPUT_DIR", "output")
     MAX_STEPS = int(os.getenv("MAX_STEPS", "15"))
     MIN_SUCCESSFUL_ACTIONS = int(os.getenv("MIN_SUCCESSFUL_ACTIONS", "2"))
 
-    APP_URLS = {
-        "linear": "https://linear.app",
-        "notion": "https://www.notion.so",
-        "asana": "https://app.asana.com",
-    }
+    # Screenshots are downscaled to this longest edge before going to Claude;
+    # vision tokens and upload time scale with pixel count.
+    VISION_MAX_EDGE = int(os.getenv("VISION_MAX_EDGE", "1280"))
+    VISION_JPEG_QUALITY = int(os.getenv("VISION_JPEG_QUALITY", "80"))
+
+    # Clip CDP screenshots to this rect instead of the full viewport; fewer
+    # pixels to encode and upload. Set either to 0 to capture the whole
+    # viewport (e.g. apps whose relevant UI sits below the fold).
+    CAPTURE_CLIP_WIDTH = int(os.getenv("CAPTURE_CLIP_WIDTH", "1280"))
+    CAPTURE_CLIP_HEIGHT = int(os.getenv("CAPTURE_CLIP_HEIGHT", "800"))
+
+    # Per-keystroke delay for the keyboard-events typing fallback. fill() is
+    # always tried first; raise this only for apps that drop fast key events.
+    TYPE_DELAY_MS = int(os.getenv("TYPE_DELAY_MS", "0"))
+
+    # Upper bound on the per-step settle wait (readyState + pending XHR).
+    # Set to 0 to skip the settle entirely on apps that are always ready.
+    EXTRA_SETTLE_MS = int(os.getenv("EXTRA_SETTLE_MS", "1500"))
+
+    # Block known ad/analytics hosts via CDP so networkidle settles faster.
+    # Disable if a target app's UI depends on one of the blocked domains.
+    BLOCK_TRACKERS = os.getenv("BLOCK_TRACKERS", "true").lower() in {"1", "true", "yes"}
+
+    # Read-only so nothing can mutate the app registry at runtime.
+    APP_URLS = MappingProxyType(
+        {
+            "linear": "https://linear.app",
+            "notion": "https://www.notion.so",
+            "asana": "https://app.asana.com",
+        }
+    )
 
     @classmethod
     def validate(cls) -> bool:
+        """Checks the environment is usable; call before constructing AgentB, not at import."""
         if not cls.ANTHROPIC_API_KEY:
             raise ValueError("ANTHROPIC_API_KEY not set in environment")
 
@@ -43,7 +76,11 @@ class Config:
             URL string or empty string if not found
         """
 
-        return cls.APP_URLS.get(app_name.lower(), "")
+        return _APP_URLS_LOWER.get(app_name.lower(), "")
 
 
-Config.validate()
+# Lowercased, interned lookup table built once at import; get_app_url runs on
+# every request and shouldn't re-normalize the registry keys each time.
+_APP_URLS_LOWER = MappingProxyType(
+    {sys.intern(name.lower()): url for name, url in Config.APP_URLS.items()}
+)
@@ -8,6 +8,7 @@ from __future__ import annotations
 import json
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from core.agent import AgentB
@@ -121,6 +122,36 @@ def interactive_mode() -> None:
         storage.export_dataset()
 
 
+def batch_mode() -> None:
+    """Reads a JSON array of requests from stdin and runs them concurrently.
+
+    The requests are independent and each one is dominated by Claude API
+    latency, so bounded parallelism gets near-linear speedup. Requests
+    targeting the same app share a browser profile and belong in separate
+    batches.
+    """
+    try:
+        requests = json.load(sys.stdin)
+        if not isinstance(requests, list):
+            raise ValueError("batch mode expects a JSON array of request objects")
+
+        agent = AgentB()
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="batch") as pool:
+            futures = [pool.submit(agent.handle_request, request) for request in requests]
+            results = [future.result() for future in futures]
+
+        succeeded = sum(1 for r in results if r.get("success"))
+        logger.info("%s", json.dumps(results, indent=2, default=str))
+        logger.info("Batch complete: %d/%d succeeded", succeeded, len(results))
+
+        if succeeded:
+            WorkflowStorage().export_dataset()
+    except json.JSONDecodeError:
+        logger.info("%s", json.dumps({"success": False, "error": "Invalid JSON input"}))
+    except Exception as exc:
+        logger.info("%s", json.dumps({"success": False, "error": str(exc)}))
+
+
 def api_mode() -> None:
     """Reads a JSON request from stdin so other tools can drive Agent B without the interactive prompts."""
     try:
@@ -136,22 +167,29 @@ def api_mode() -> None:
 
 def main() -> None:
     """Dispatches CLI commands so users can launch interactive mode or wire up the API-friendly flow."""
+    command = sys.argv[1].lower() if len(sys.argv) > 1 else "interactive"
+
+    # Help shouldn't require a configured environment; everything else does.
+    if command not in {"help", "-h", "--help"}:
+        Config.validate()
+
     if len(sys.argv) == 1:
         interactive_mode()
         return
 
-    command = sys.argv[1].lower()
-
     if command in {"interactive", "i"}:
         interactive_mode()
     elif command in {"api", "a"}:
         api_mode()
+    elif command in {"batch", "b"}:
+        batch_mode()
     elif command in {"help", "-h", "--help"}:
         logger.info("")
         logger.info(
-            "Usage: python main.py [interactive|api]\n"
+            "Usage: python main.py [interactive|api|batch]\n"
             "   interactive (default) - start interactive capture mode\n"
             "   api                   - read JSON request from stdin\n"
+            "   batch                 - read a JSON array of requests from stdin and run them concurrently\n"
         )
     else:
         logger.info("")
@@ -160,6 +198,7 @@ def main() -> None:
             "Available commands:\n"
             "   interactive (default)\n"
             "   api\n"
+            "   batch\n"
         )
 
 
@@ -12,7 +12,6 @@ Usage:
 from __future__ import annotations
 
 import logging
-import time
 from pathlib import Path
 
 from playwright.sync_api import sync_playwright
@@ -25,24 +24,26 @@ APPS = [
     ("asana", "https://app.asana.com"),
 ]
 
+_SINGLETON_LOCK_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+
 
 def cleanup_singleton_locks(profile_dir: Path) -> None:
     """Remove Chrome lock files so profiles can be reopened."""
 
-    lock_files = ["SingletonLock", "SingletonSocket", "SingletonCookie"]
-    for name in lock_files:
-        path = profile_dir / name
+    # unlink(missing_ok=True) is one syscall per file and has no window
+    # between an exists() check and the unlink.
+    for name in _SINGLETON_LOCK_FILES:
         try:
-            if path.exists():
-                path.unlink()
-                logger.debug("Removed stale %s", name)
-        except Exception as exc:  # noqa: BLE001
+            (profile_dir / name).unlink(missing_ok=True)
+        except OSError as exc:
             logger.debug("Could not remove %s: %s", name, exc)
 
 
-def launch_chrome_with_profile(app_name: str, app_url: str) -> None:
-    """Launch Chrome via Playwright using a persistent profile."""
+def _open_app_window(playwright, app_name: str, app_url: str):
+    """Opens a Chrome window on the app's persistent profile and navigates to it.
 
+    Returns the context; the caller owns closing it (after the manual login).
+    """
     profile_dir = Path("auth_states") / app_name.lower()
     profile_dir.mkdir(parents=True, exist_ok=True)
     cleanup_singleton_locks(profile_dir)
@@ -54,6 +55,61 @@ def launch_chrome_with_profile(app_name: str, app_url: str) -> None:
     logger.info(separator)
     logger.info("Profile directory: %s", profile_dir)
     logger.info("URL: %s", app_url)
+    logger.info("")
+
+    logger.info("Launching Chrome", extra={"app": app_name, "profile": str(profile_dir)})
+
+    try:
+        context = playwright.chromium.launch_persistent_context(
+            user_data_dir=str(profile_dir),
+            channel="chrome",
+            headless=False,
+            args=[
+                "--disable-blink-features=AutomationControlled",
+                "--no-first-run",
+                "--no-default-browser-check",
+                "--start-maximized",
+            ],
+            viewport={"width": 1920, "height": 1080},
+        )
+    except Exception:
+        logger.exception("Failed to launch Chrome", extra={"app": app_name})
+        raise
+
+    if context.pages:
+        page = context.pages[0]
+        logger.info("Using existing page", extra={"url": page.url})
+    else:
+        # Persistent Chrome usually opens its initial tab a beat after
+        # launch; wait for that event instead of a fixed pause.
+        logger.info("Waiting for Chrome to open its first tab")
+        try:
+            page = context.wait_for_event("page", timeout=5000)
+            logger.info("Using initial page", extra={"url": page.url})
+        except Exception:  # noqa: BLE001
+            page = context.new_page()
+            logger.info("Created new page")
+
+    logger.info("Navigating", extra={"url": app_url})
+    logger.info("Opening %s...", app_url)
+    try:
+        # No settle wait after goto: the human pressing Enter is the real
+        # ready signal, so a fixed pause here is pure dead time.
+        page.goto(app_url, wait_until="domcontentloaded", timeout=60000)
+        logger.info("Navigation successful", extra={"url": page.url})
+        logger.info("Page loaded: %s", page.url)
+        logger.info("")
+    except Exception as nav_error:
+        logger.error("Navigation failed", extra={"error": str(nav_error)})
+        logger.info("WARNING: Navigation failed. Please navigate manually in Chrome.")
+        logger.info("")
+
+    return context
+
+
+def launch_chrome_with_profile(playwright, app_name: str, app_url: str) -> None:
+    """Launch Chrome on the shared Playwright driver using a persistent profile."""
+
     logger.info("")
     logger.info("Instructions:")
     logger.info("1. Chrome will open with a dedicated profile.")
@@ -61,60 +117,59 @@ def launch_chrome_with_profile(app_name: str, app_url: str) -> None:
     logger.info("3. When you reach the app dashboard, return here and press Enter.")
     logger.info("")
 
-    logger.info("Launching Chrome", extra={"app": app_name, "profile": str(profile_dir)})
+    context = _open_app_window(playwright, app_name, app_url)
+    try:
+        input("Press Enter after logging in and reaching the main app screen...")
+        logger.info("User indicated login complete", extra={"app": app_name})
+    finally:
+        context.close()
+        logger.info("Chrome context closed", extra={"app": app_name})
 
-    with sync_playwright() as playwright:
-        try:
-            context = playwright.chromium.launch_persistent_context(
-                user_data_dir=str(profile_dir),
-                channel="chrome",
-                headless=False,
-                args=[
-                    "--disable-blink-features=AutomationControlled",
-                    "--no-first-run",
-                    "--no-default-browser-check",
-                    "--start-maximized",
-                ],
-                viewport={"width": 1920, "height": 1080},
-            )
-        except Exception as exc: 
-            logger.exception("Failed to launch Chrome", extra={"app": app_name})
-            raise
+    logger.info("")
+    logger.info("SUCCESS!")
+    logger.info("   Saved Chrome profile for %s at %s", app_name, Path("auth_states") / app_name.lower())
+    logger.info("   Future workflows will reuse this profile automatically.")
+    logger.info("")
 
-        try:
-            logger.info("Waiting for Chrome to initialize")
-            time.sleep(3)
-
-            if context.pages:
-                page = context.pages[0]
-                logger.info("Using existing page", extra={"url": page.url})
-            else:
-                page = context.new_page()
-                logger.info("Created new page")
-
-            logger.info("Navigating", extra={"url": app_url})
-            logger.info("Opening %s...", app_url)
+
+def setup_all_apps(playwright) -> None:
+    """Opens every app in its own Chrome window at once so the logins overlap.
+
+    One Enter confirms all of them; total wall time is the slowest login
+    instead of the sum of all three plus fixed sleeps.
+    """
+    logger.info("")
+    logger.info("Instructions:")
+    logger.info("1. A Chrome window opens for EACH app, each with its own profile.")
+    logger.info("2. Log into all of them in any order.")
+    logger.info("3. When every app shows its dashboard, return here and press Enter once.")
+    logger.info("")
+
+    contexts = []
+    try:
+        for app_name, app_url in APPS:
             try:
-                page.goto(app_url, wait_until="domcontentloaded", timeout=60000)
-                page.wait_for_timeout(2000)
-                logger.info("Navigation successful", extra={"url": page.url})
-                logger.info("Page loaded: %s", page.url)
-                logger.info("")
-            except Exception as nav_error: 
-                logger.error("Navigation failed", extra={"error": str(nav_error)})
-                logger.info("WARNING: Navigation failed. Please navigate manually in Chrome.")
-                logger.info("")
-
-            input("Press Enter after logging in and reaching the main app screen...")
-            logger.info("User indicated login complete", extra={"app": app_name})
-        finally:
-            context.close()
-            logger.info("Chrome context closed", extra={"app": app_name})
+                contexts.append((app_name, _open_app_window(playwright, app_name, app_url)))
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Error setting up %s: %s", app_name, exc, exc_info=True)
+
+        if not contexts:
+            logger.info("No Chrome windows could be opened.")
+            return
+
+        input("Press Enter after logging into ALL open windows...")
+    finally:
+        for app_name, context in contexts:
+            try:
+                context.close()
+                logger.info("Chrome context closed", extra={"app": app_name})
+            except Exception:  # noqa: BLE001
+                pass
 
     logger.info("")
     logger.info("SUCCESS!")
-    logger.info("   Saved Chrome profile for %s at %s", app_name, profile_dir)
-    logger.info("   Future workflows will reuse this profile automatically.")
+    logger.info("   Saved Chrome profiles for: %s", ", ".join(name for name, _ in contexts))
+    logger.info("   Future workflows will reuse these profiles automatically.")
     logger.info("")
 
 
@@ -153,22 +208,15 @@ def main() -> None:
 
     if choice_num == len(APPS) + 1:
         logger.info("Setting up auth for all apps")
-        for app_name, app_url in APPS:
-            try:
-                launch_chrome_with_profile(app_name, app_url)
-                logger.info("")
-                logger.info("%s", "─" * 70)
-                logger.info("")
-                time.sleep(2)
-            except Exception as exc:  # noqa: BLE001
-                logger.exception("Auth setup failed", extra={"app": app_name})
-                logger.info("")
-                logger.error("Error setting up %s: %s", app_name, exc, exc_info=True)
-                logger.info("")
+        # One Playwright driver (the Node subprocess) serves every Chrome
+        # launch; starting it is the expensive part, not Chromium itself.
+        with sync_playwright() as playwright:
+            setup_all_apps(playwright)
     elif 1 <= choice_num <= len(APPS):
         app_name, app_url = APPS[choice_num - 1]
         logger.info("Setting up auth for single app", extra={"app": app_name})
-        launch_chrome_with_profile(app_name, app_url)
+        with sync_playwright() as playwright:
+            launch_chrome_with_profile(playwright, app_name, app_url)
     else:
         logger.warning("Invalid menu choice", extra={"choice": choice_num})
         logger.info("")
@@ -0,0 +1,51 @@
+import json
+
+import core.agent  # noqa: F401  # import through core first; entering via capture trips the import cycle
+
+from capture.playwright_capture import _JsonCompletionTracker, _extract_json_object
+
+
+def test_extract_json_object_handles_nested_objects() -> None:
+    text = 'Sure! {"action": "click", "location": {"position": "top right"}} hope that helps'
+    assert json.loads(_extract_json_object(text)) == {
+        "action": "click",
+        "location": {"position": "top right"},
+    }
+
+
+def test_extract_json_object_ignores_braces_and_quotes_inside_strings() -> None:
+    text = '{"description": "a } brace and a \\" quote and a { too", "action": "click"}'
+    result = json.loads(_extract_json_object(text))
+    assert result["action"] == "click"
+
+
+def test_extract_json_object_returns_tail_when_truncated() -> None:
+    text = 'prefix {"action": "click", "target": "Sub'
+    assert _extract_json_object(text) == '{"action": "click", "target": "Sub'
+
+
+def test_extract_json_object_without_brace_returns_input() -> None:
+    text = "no json here"
+    assert _extract_json_object(text) == text
+
+
+def test_tracker_completes_exactly_when_first_object_closes() -> None:
+    tracker = _JsonCompletionTracker()
+    assert not tracker.feed('{"location": {"position": "top"}')
+    assert tracker.feed("}")
+
+
+def test_tracker_handles_strings_split_across_chunk_boundaries() -> None:
+    payload = '{"text": "say \\"hi\\" with } inside"}'
+    tracker = _JsonCompletionTracker()
+    completed_at = None
+    for idx, char in enumerate(payload):
+        if tracker.feed(char):
+            completed_at = idx
+            break
+    assert completed_at == len(payload) - 1
+
+
+def test_tracker_stays_incomplete_on_truncated_stream() -> None:
+    tracker = _JsonCompletionTracker()
+    assert not tracker.feed('{"action": "click", "target": "Sub')
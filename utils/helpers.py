@@ -1,11 +1,19 @@
 """Helper utilities."""
 
+import functools
 import re
 from urllib.parse import urlparse
-from typing import Optional
+from typing import Optional, Tuple
 
 
 
+# Compiled once; slugify runs per workflow, per screenshot, and per profile
+# lookup, so even the re-cache dispatch adds up.
+_SLUG_STRIP = re.compile(r"[^\w\s-]")
+_SLUG_SPACES = re.compile(r"[-\s]+")
+
+
+@functools.lru_cache(maxsize=1024)
 def extract_app_name(url: str) -> str:
     """Pulls the likely app name from a URL, stripping www/app prefixes so we get 'linear' style names."""
 
@@ -15,40 +23,56 @@ def extract_app_name(url: str) -> str:
     return name or "unknown"
 
 
+@functools.lru_cache(maxsize=1024)
 def slugify(text: str) -> str:
     """Turns free-form text into a filesystem-friendly slug we can use for folders and filenames."""
 
-    text = text.lower()
-    text = re.sub(r"[^\w\s-]", "", text)
-    text = re.sub(r"[-\s]+", "_", text)
+    text = _SLUG_STRIP.sub("", text.lower())
+    text = _SLUG_SPACES.sub("_", text)
     return text[:50]
 
 
 def detect_app_from_task(task: str, known_apps: dict) -> Optional[str]:
-    """Looks inside the natural-language task for mentions of apps we know about and returns the best match."""
+    """Looks inside the natural-language task for mentions of apps we know about and returns the best match.
+
+    Memoized on (task, app names): the CLI detects the app once for display
+    and AgentB detects it again for the same task string.
+    """
 
     if not task:
         return None
 
-    task_lower = task.lower()
-
-    # Pattern 1: exact app name matches (word boundaries)
-    for app_name in known_apps.keys():
-        pattern = r'\b' + re.escape(app_name.lower()) + r'\b'
-        if re.search(pattern, task_lower):
-            return app_name
-
-    # Pattern 2: common variations / domains
-    app_variations = {
-        'linear': [r'\blinear\b', r'\blinear\.app\b'],
-        'notion': [r'\bnotion\b', r'\bnotion\.so\b'],
-        'asana': [r'\basana\b', r'\basana\.com\b'],
-    }
-
-    for app_name, patterns in app_variations.items():
-        if app_name in known_apps:
-            for pattern in patterns:
-                if re.search(pattern, task_lower):
-                    return app_name
-
+    return _detect_app_cached(task.lower(), tuple(known_apps))
+
+
+# Domain suffix per app so "linear.app" style mentions match too.
+_APP_DOMAIN_SUFFIXES = {
+    "linear": "app",
+    "notion": "so",
+    "asana": "com",
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _app_pattern(known_apps: Tuple[str, ...]):
+    """Builds one alternation matching every known app (and its domain form) in a single pass."""
+    parts = []
+    token_map = {}
+    for app_name in known_apps:
+        root = app_name.lower()
+        token_map[root] = app_name
+        escaped = re.escape(root)
+        suffix = _APP_DOMAIN_SUFFIXES.get(root)
+        if suffix:
+            escaped += rf"(?:\.{suffix})?"
+        parts.append(escaped)
+    return re.compile(r"\b(" + "|".join(parts) + r")\b"), token_map
+
+
+@functools.lru_cache(maxsize=256)
+def _detect_app_cached(task_lower: str, known_apps: Tuple[str, ...]) -> Optional[str]:
+    pattern, token_map = _app_pattern(known_apps)
+    match = pattern.search(task_lower)
+    if match:
+        return token_map[match.group(1).split(".")[0]]
     return None
@@ -4,8 +4,10 @@ Storage utilities for organizing and exporting captured workflows.
 
 from __future__ import annotations
 
-import base64
+import binascii
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List
@@ -14,16 +16,110 @@ import logging
 
 from utils.helpers import slugify
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 
 logger = logging.getLogger(__name__)
 
 
+# Shared stylesheet for every guide.html; written once to base_dir instead of
+# being inlined (~2KB) into each generated page.
+_GUIDE_CSS = """\
+* { margin: 0; padding: 0; box-sizing: border-box; }
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+    line-height: 1.6;
+    color: #333;
+    background: #f8f9fa;
+    padding: 40px 20px;
+}
+.container { max-width: 1200px; margin: 0 auto; }
+.header {
+    background: white;
+    padding: 40px;
+    border-radius: 12px;
+    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+    margin-bottom: 30px;
+}
+h1 { color: #2563eb; margin-bottom: 20px; }
+.meta { color: #666; font-size: 15px; margin-top: 10px; }
+.status {
+    display: inline-block;
+    padding: 6px 16px;
+    border-radius: 20px;
+    font-size: 14px;
+    font-weight: 600;
+    margin-top: 15px;
+    color: white;
+}
+.step {
+    background: white;
+    padding: 30px;
+    border-radius: 12px;
+    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+    margin-bottom: 30px;
+}
+.step-header {
+    display: flex;
+    align-items: center;
+    margin-bottom: 20px;
+}
+.step-number {
+    background: #2563eb;
+    color: white;
+    width: 48px;
+    height: 48px;
+    border-radius: 50%;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    font-size: 20px;
+    font-weight: bold;
+    margin-right: 20px;
+    flex-shrink: 0;
+}
+.step-title { font-size: 22px; font-weight: 600; }
+.step-image {
+    width: 100%;
+    border-radius: 8px;
+    border: 1px solid #e5e7eb;
+    margin: 20px 0;
+    box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+}
+.step-info {
+    background: #f9fafb;
+    padding: 16px;
+    border-radius: 8px;
+    font-size: 14px;
+}
+.footer {
+    text-align: center;
+    padding: 40px 20px;
+    color: #666;
+    font-size: 14px;
+}
+"""
+
+
+def _dumps_indented(obj: Any) -> bytes:
+    """Serializes to pretty-printed JSON bytes, preferring orjson's C encoder when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str)
+    return json.dumps(obj, indent=2, default=str).encode("utf-8")
+
+
 class WorkflowStorage:
     """Manage persisted workflow artifacts."""
 
     def __init__(self, base_dir: str = "output") -> None:
         self.base_dir = Path(base_dir)
-        self.base_dir.mkdir(exist_ok=True)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        css_path = self.base_dir / "guide.css"
+        if not css_path.exists():
+            css_path.write_text(_GUIDE_CSS)
 
     def save_workflow(self, workflow_result: Dict[str, Any]) -> Path:
         """Writes out the screenshots, metadata, and friendly docs for a single captured run."""
@@ -33,52 +129,130 @@ class WorkflowStorage:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         task_slug = slugify(task)
         workflow_dir = self.base_dir / app / f"{task_slug}_{timestamp}"
-        workflow_dir.mkdir(parents=True, exist_ok=True)
 
+        # One mkdir walk creates workflow_dir and screenshots/ together.
         screenshots_dir = workflow_dir / "screenshots"
-        screenshots_dir.mkdir(exist_ok=True)
+        screenshots_dir.mkdir(parents=True, exist_ok=True)
 
         screenshots = workflow_result.get("screenshots", [])
-        for screenshot in screenshots:
+
+        def _write_screenshot(screenshot: Dict[str, Any]) -> None:
+            step = screenshot.get("step", 0)
+            extension = self._screenshot_extension(screenshot)
+            screenshot_path = screenshots_dir / f"step_{str(step).zfill(2)}.{extension}"
+
+            # In-process producers can hand us raw bytes and skip the base64
+            # round-trip (~33% extra memory and an encode+decode) entirely.
+            raw = screenshot.get("bytes")
+            if raw:
+                screenshot_path.write_bytes(raw)
+                return
+
+            source = screenshot.get("path")
+            if source:
+                # Frames are spilled to disk during capture; move them into place.
+                try:
+                    Path(source).replace(screenshot_path)
+                except OSError:
+                    screenshot_path.write_bytes(Path(source).read_bytes())
+                return
+
             data = screenshot.get("data")
             if not data:
-                continue
-            step = screenshot.get("step", 0)
-            screenshot_path = screenshots_dir / f"step_{str(step).zfill(2)}.png"
-            screenshot_path.write_bytes(base64.b64decode(data))
-
-        metadata = {
-            **workflow_result,
-            "screenshots": [
-                {
-                    "step": s.get("step"),
-                    "url": s.get("url"),
-                    "timestamp": s.get("timestamp"),
-                    "filename": f"screenshots/step_{str(s.get('step')).zfill(2)}.png",
-                }
-                for s in screenshots
-            ],
-        }
+                return
+            # a2b_base64 is the C decoder base64.b64decode wraps, minus the
+            # validation/translation branches; decode once, write once.
+            if isinstance(data, str):
+                data = data.encode("ascii")
+            screenshot_path.write_bytes(binascii.a2b_base64(data))
+
+        # Never spread the original screenshots list into the new dict; with
+        # legacy in-memory payloads that would briefly double every frame.
+        metadata = {key: value for key, value in workflow_result.items() if key != "screenshots"}
+        metadata["screenshots"] = [
+            {
+                "step": s.get("step"),
+                "url": s.get("url"),
+                "timestamp": s.get("timestamp"),
+                "filename": (
+                    f"screenshots/step_{str(s.get('step')).zfill(2)}.{self._screenshot_extension(s)}"
+                ),
+            }
+            for s in screenshots
+        ]
 
-        (workflow_dir / "workflow.json").write_text(json.dumps(metadata, indent=2, default=str))
-        self._generate_readme(workflow_dir, metadata)
-        self._generate_html(workflow_dir, metadata)
+        # Screenshot writes and the three generated docs are independent
+        # disk work; overlap their write() syscalls instead of running them
+        # back to back.
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(_write_screenshot, s) for s in screenshots]
+            futures.append(
+                pool.submit((workflow_dir / "workflow.json").write_bytes, _dumps_indented(metadata))
+            )
+            futures.append(pool.submit(self._generate_readme, workflow_dir, metadata))
+            futures.append(pool.submit(self._generate_html, workflow_dir, metadata))
+            for future in futures:
+                future.result()
+
+        # Relocating the spilled frames leaves their staging dir
+        # (output/.runs/<slug>_<ts>/) empty; drop it rather than leaving one
+        # behind per run. rmdir refuses non-empty dirs, so this is safe.
+        for run_dir in {Path(s["path"]).parent for s in screenshots if s.get("path")}:
+            try:
+                run_dir.rmdir()
+            except OSError:
+                pass
 
         logger.info("Saved workflow to: %s", workflow_dir)
         logger.info("")
         return workflow_dir
 
+    def discard_workflow(self, workflow_result: Dict[str, Any]) -> None:
+        """Deletes the spilled frames of a run that won't be saved.
+
+        Failed captures never reach save_workflow, so without this their
+        staging dirs under output/.runs accumulate forever.
+        """
+        run_dirs = set()
+        for screenshot in workflow_result.get("screenshots", []):
+            source = screenshot.pop("path", None)
+            if not source:
+                continue
+            path = Path(source)
+            run_dirs.add(path.parent)
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+        for run_dir in run_dirs:
+            try:
+                run_dir.rmdir()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _screenshot_extension(screenshot: Dict[str, Any]) -> str:
+        """Picks the file extension matching the screenshot's media type (JPEG from CDP, PNG otherwise)."""
+        source = screenshot.get("path")
+        if source:
+            suffix = Path(source).suffix.lstrip(".")
+            if suffix:
+                return suffix
+        media_type = screenshot.get("media_type", "image/png")
+        return "jpg" if media_type == "image/jpeg" else "png"
+
     def _generate_readme(self, workflow_dir: Path, metadata: Dict[str, Any]) -> None:
         """Builds a markdown summary so humans can skim the workflow without opening the HTML."""
+        task = metadata.get("task", "Workflow")
         lines = [
-            f"# {metadata.get('task', 'Workflow')}\n",
+            f"# {task}\n",
             f"**App**: {metadata.get('app', 'Unknown')}  ",
             f"**Status**: {'Success' if metadata.get('success') else 'Failed'}  ",
             f"**Steps**: {metadata.get('total_steps', 0)}  ",
             f"**Date**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  \n",
             "---\n",
             "## Overview\n",
-            f"This workflow demonstrates how to: {metadata.get('task', 'accomplish a task')}\n",
+            f"This workflow demonstrates how to: {task}\n",
             f"Starting URL: {metadata.get('starting_url', 'N/A')}\n",
             "## Steps\n",
         ]
@@ -109,88 +283,16 @@ class WorkflowStorage:
         status_color = "#10b981" if success else "#f59e0b"
         status_text = "Completed Successfully" if success else "Incomplete"
 
-        html = f"""<!DOCTYPE html>
+        # Collect fragments and join once; += in the loop would recopy the
+        # whole document per step. The stylesheet is a shared asset written
+        # once at base_dir, two levels up from every workflow dir.
+        parts = [f"""<!DOCTYPE html>
 <html lang=\"en\">
 <head>
     <meta charset=\"UTF-8\">
     <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">
     <title>{task}</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: #f8f9fa;
-            padding: 40px 20px;
-        }}
-        .container {{ max-width: 1200px; margin: 0 auto; }}
-        .header {{
-            background: white;
-            padding: 40px;
-            border-radius: 12px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            margin-bottom: 30px;
-        }}
-        h1 {{ color: #2563eb; margin-bottom: 20px; }}
-        .meta {{ color: #666; font-size: 15px; margin-top: 10px; }}
-        .status {{
-            display: inline-block;
-            padding: 6px 16px;
-            border-radius: 20px;
-            font-size: 14px;
-            font-weight: 600;
-            margin-top: 15px;
-            background: {status_color};
-            color: white;
-        }}
-        .step {{
-            background: white;
-            padding: 30px;
-            border-radius: 12px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            margin-bottom: 30px;
-        }}
-        .step-header {{
-            display: flex;
-            align-items: center;
-            margin-bottom: 20px;
-        }}
-        .step-number {{
-            background: #2563eb;
-            color: white;
-            width: 48px;
-            height: 48px;
-            border-radius: 50%;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            font-size: 20px;
-            font-weight: bold;
-            margin-right: 20px;
-            flex-shrink: 0;
-        }}
-        .step-title {{ font-size: 22px; font-weight: 600; }}
-        .step-image {{
-            width: 100%;
-            border-radius: 8px;
-            border: 1px solid #e5e7eb;
-            margin: 20px 0;
-            box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-        }}
-        .step-info {{
-            background: #f9fafb;
-            padding: 16px;
-            border-radius: 8px;
-            font-size: 14px;
-        }}
-        .footer {{
-            text-align: center;
-            padding: 40px 20px;
-            color: #666;
-            font-size: 14px;
-        }}
-    </style>
+    <link rel=\"stylesheet\" href=\"../../guide.css\">
 </head>
 <body>
     <div class=\"container\">
@@ -200,16 +302,16 @@ class WorkflowStorage:
                 <strong>Application:</strong> {app} •
                 <strong>Steps:</strong> {total_steps}
             </div>
-            <div class=\"status\">{status_text}</div>
+            <div class=\"status\" style=\"background: {status_color};\">{status_text}</div>
         </div>
-"""
+"""]
 
         for screenshot in screenshots:
             step = screenshot.get("step")
             filename = screenshot.get("filename", "")
             url = screenshot.get("url", "N/A")
 
-            html += f"""
+            parts.append(f"""
         <div class=\"step\">
             <div class=\"step-header\">
                 <div class=\"step-number\">{step}</div>
@@ -220,43 +322,74 @@ class WorkflowStorage:
                 <strong>URL:</strong> <code>{url}</code>
             </div>
         </div>
-"""
+""")
 
-        html += """
+        parts.append("""
         <div class=\"footer\">
             Generated by AI Workflow Capture System
         </div>
     </div>
 </body>
 </html>
-"""
+""")
 
-        (workflow_dir / "guide.html").write_text(html)
+        (workflow_dir / "guide.html").write_text("".join(parts))
 
     def list_workflows(self, app_name: str | None = None) -> List[Dict[str, Any]]:
         """Scans the output directory and returns lightweight metadata for each stored workflow."""
         workflows: List[Dict[str, Any]] = []
-        search_dir = self.base_dir / app_name if app_name else self.base_dir
+        base = str(self.base_dir)
+
+        # The layout is fixed at base_dir/<app>/<slug_timestamp>/workflow.json,
+        # so walk exactly two directory levels with os.scandir instead of
+        # rglob, which allocates a Path (plus stat) per intermediate entry.
+        if app_name:
+            app_dirs = [os.path.join(base, app_name)]
+        else:
+            try:
+                app_dirs = [entry.path for entry in os.scandir(base) if entry.is_dir()]
+            except FileNotFoundError:
+                return workflows
+
+        paths: List[str] = []
+        for app_dir in app_dirs:
+            try:
+                entries = os.scandir(app_dir)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        # No isfile() probe; _load treats a missing file like
+                        # an unreadable one and skips it.
+                        paths.append(os.path.join(entry.path, "workflow.json"))
 
-        if not search_dir.exists():
-            return workflows
+        # One timestamp for the listing; it's "scanned at", not per-workflow.
+        now_iso = datetime.now().isoformat()
 
-        for workflow_json in search_dir.rglob("workflow.json"):
+        def _load(workflow_json: str) -> "tuple[str, Dict[str, Any]] | None":
             try:
-                data = json.loads(workflow_json.read_text())
+                with open(workflow_json, "rb") as handle:
+                    return workflow_json, json.loads(handle.read())
+            except Exception:  # noqa: BLE001
+                return None
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for loaded in pool.map(_load, paths):
+                if loaded is None:
+                    continue
+                workflow_json, data = loaded
                 workflows.append(
                     {
-                        "path": str(workflow_json.parent.relative_to(self.base_dir)),
+                        "path": os.path.relpath(os.path.dirname(workflow_json), base),
                         "app": data.get("app", "unknown"),
                         "task": data.get("task", "Unknown"),
                         "method": data.get("method", "playwright"),
                         "success": data.get("success", False),
                         "steps": data.get("total_steps", 0),
-                        "date": datetime.now().isoformat(),
+                        "date": now_iso,
                     }
                 )
-            except Exception:  # noqa: BLE001
-                continue
 
         return workflows
 
@@ -278,7 +411,7 @@ class WorkflowStorage:
         }
 
         output_path = self.base_dir / output_file
-        output_path.write_text(json.dumps(dataset, indent=2))
+        output_path.write_bytes(_dumps_indented(dataset))
         self._generate_dataset_readme(dataset)
 
         separator = "=" * 70
@@ -313,11 +446,13 @@ class WorkflowStorage:
             "## Applications\n",
         ]
 
+        # One dict index per row instead of re-evaluating a conditional.
+        status_map = {True: "SUCCESS", False: "INCOMPLETE"}
         for app, workflows in dataset["workflows_by_app"].items():
             lines.append(f"### {app.title()}\n")
             lines.append(f"**Workflows**: {len(workflows)}\n")
             for workflow in workflows:
-                status = "SUCCESS" if workflow["success"] else "INCOMPLETE"
+                status = status_map[bool(workflow["success"])]
                 lines.append(
                     f"- {status} **{workflow['task']}** ({workflow['steps']} steps) — `{workflow['path']}`\n"
                 )